@@ -1,7 +1,6 @@
 import os
 import time
 import shutil
-import ast
 import subprocess
 from typing import Tuple
 
@@ -114,7 +113,7 @@ def adjust_audio_speed(input_file: str, output_file: str, speed_factor: float) -
 def process_row(row: pd.Series, tasks_df: pd.DataFrame) -> Tuple[int, float]:
     """Helper function for processing single row data"""
     number = row['number']
-    lines = ast.literal_eval(row['lines']) if isinstance(row['lines'], str) else row['lines']
+    lines = row['lines']
     real_dur = 0
     for line_index, line in enumerate(lines):
         temp_file = TEMP_FILE_TEMPLATE.format(f"{number}_{line_index}")
@@ -211,7 +210,7 @@ def merge_chunks(tasks_df: pd.DataFrame) -> pd.DataFrame:
                     cur_time += chunk_df.iloc[i-1]['gap']/speed_factor
                 new_sub_times = []
                 number = row['number']
-                lines = ast.literal_eval(row['lines']) if isinstance(row['lines'], str) else row['lines']
+                lines = row['lines']
                 for line_index, line in enumerate(lines):
                     # 🔄 Step2: Start speed change and save as OUTPUT_FILE_TEMPLATE
                     temp_file = TEMP_FILE_TEMPLATE.format(f"{number}_{line_index}")
@@ -233,7 +232,7 @@ def merge_chunks(tasks_df: pd.DataFrame) -> pd.DataFrame:
                     rprint(f"[yellow]⚠️ Chunk {chunk_start} to {index} exceeds by {time_diff:.3f}s, truncating last audio[/yellow]")
                     # Get the last audio file
                     last_number = tasks_df.iloc[index]['number']
-                    last_lines = ast.literal_eval(tasks_df.iloc[index]['lines']) if isinstance(tasks_df.iloc[index]['lines'], str) else tasks_df.iloc[index]['lines']
+                    last_lines = tasks_df.iloc[index]['lines']
                     last_line_index = len(last_lines) - 1
                     last_file = OUTPUT_FILE_TEMPLATE.format(f"{last_number}_{last_line_index}")
                     
@@ -264,7 +263,7 @@ def gen_audio() -> None:
     os.makedirs(_AUDIO_SEGS_DIR, exist_ok=True)
     
     # 📝 Step2: Load task file
-    tasks_df = pd.read_excel(_8_1_AUDIO_TASK)
+    tasks_df = load_artifact(_8_1_AUDIO_TASK, list_columns=AUDIO_TASK_LIST_COLUMNS)
     rprint("[green]📊 Loaded task file successfully[/green]")
     
     # 🔊 Step3: Generate TTS audio
@@ -274,7 +273,7 @@ def gen_audio() -> None:
     tasks_df = merge_chunks(tasks_df)
     
     # 💾 Step5: Save results
-    tasks_df.to_excel(_8_1_AUDIO_TASK, index=False)
+    save_artifact(tasks_df, _8_1_AUDIO_TASK)
     rprint("[bold green]🎉 Audio generation completed successfully![/bold green]")
 
 if __name__ == "__main__":
@@ -1,6 +1,4 @@
 import os
-import ast
-import pandas as pd
 import subprocess
 from pydub import AudioSegment
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
@@ -14,14 +12,11 @@ DUB_VOCAL_FILE = 'output/dub.mp3'
 DUB_SUB_FILE = 'output/dub.srt'
 OUTPUT_FILE_TEMPLATE = f"{_AUDIO_SEGS_DIR}/{{}}.wav"
 
-def load_and_flatten_data(excel_file):
-    """Load and flatten Excel data"""
-    df = pd.read_excel(excel_file)
-    lines = [ast.literal_eval(line) if isinstance(line, str) else line for line in df['lines'].tolist()]
-    lines = [item for sublist in lines for item in sublist]
-    
-    new_sub_times = [ast.literal_eval(time) if isinstance(time, str) else time for time in df['new_sub_times'].tolist()]
-    new_sub_times = [item for sublist in new_sub_times for item in sublist]
+def load_and_flatten_data(task_file):
+    """Load and flatten the audio task table"""
+    df = load_artifact(task_file, list_columns=AUDIO_TASK_LIST_COLUMNS)
+    lines = [item for sublist in df['lines'] for item in sublist]
+    new_sub_times = [item for sublist in df['new_sub_times'] for item in sublist]
     
     return df, lines, new_sub_times
 
@@ -30,7 +25,7 @@ def get_audio_files(df):
     audios = []
     for index, row in df.iterrows():
         number = row['number']
-        line_count = len(ast.literal_eval(row['lines']) if isinstance(row['lines'], str) else row['lines'])
+        line_count = len(row['lines'])
         for line_index in range(line_count):
             temp_file = OUTPUT_FILE_TEMPLATE.format(f"{number}_{line_index}")
             audios.append(temp_file)
@@ -2,7 +2,20 @@ from core.utils import *
 from core.asr_backend.demucs_vl import demucs_audio
 from core.asr_backend.audio_preprocess import process_transcription, convert_video_to_audio, split_audio, save_results, normalize_audio_volume
 from core._1_ytdlp import find_video_files
+from core._6_gen_sub import load_word_index
 from core.utils.models import *
+from core.utils.pcm_store import pcm_duration
+from concurrent.futures import ProcessPoolExecutor
+
+def pool_segment_len(duration, workers):
+    """Segment length (s) for `workers` pool processes: shorter segments so every worker gets one, but 5 to 30 minutes"""
+    return min(30*60, max(duration / workers, 5*60))
+
+def transcribe_segments_in_pool(ts, load_model, segments, vocal_audio, workers, cpu_threads):
+    """Transcribe segments in worker processes that each load the model once, results keep the segment order"""
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_model, initargs=(load_key("whisper.model"), cpu_threads)) as executor:
+        futures = [executor.submit(ts, _RAW_AUDIO_FILE, vocal_audio, start, end) for start, end in segments]
+        return [future.result() for future in futures]
 
 @check_file_exists(_2_CLEANED_CHUNKS)
 def transcribe():
@@ -18,16 +31,26 @@ def transcribe():
         vocal_audio = _RAW_AUDIO_FILE
 
     # 3. Extract audio
-    segments = split_audio(_RAW_AUDIO_FILE)
+    runtime = load_key("whisper.runtime")
+    workers = max(int(load_key("whisper.cpu_workers")), 1) if runtime == "faster_whisper" else 1
+    if workers > 1:
+        segments = split_audio(_RAW_AUDIO_FILE, target_len=pool_segment_len(pcm_duration(_RAW_AUDIO_FILE), workers))
+    else:
+        segments = split_audio(_RAW_AUDIO_FILE)
+    use_pool = workers > 1 and len(segments) > 1
     
     # 4. Transcribe audio by clips
-    all_results = []
-    runtime = load_key("whisper.runtime")
     if runtime == "mlx":
         from core.asr_backend.mlx_whisper_local import transcribe_audio as ts, load_whisper_model
         rprint("[cyan]🎤 Transcribing audio with MLX-Whisper (Mac Optimized)...[/cyan]")
         whisper_model_name = load_key("whisper.model")
         load_whisper_model(whisper_model_name)
+    elif runtime == "faster_whisper":
+        from core.asr_backend.faster_whisper_local import transcribe_audio as ts, load_whisper_model, threads_per_worker
+        rprint(f"[cyan]🎤 Transcribing audio with faster-whisper on CPU ({workers} worker(s))...[/cyan]")
+        rprint("[yellow]⚠️ faster-whisper runtime does not diarize, segments have no speaker_id[/yellow]")
+        if not use_pool:
+            load_whisper_model(load_key("whisper.model"), threads_per_worker(1))
     elif runtime == "elevenlabs":
         from core.asr_backend.elevenlabs_asr import transcribe_audio_elevenlabs as ts
         rprint("[cyan]🎤 Transcribing audio with ElevenLabs API...[/cyan]")
@@ -38,9 +61,11 @@ def transcribe():
         whisper_model_name = load_key("whisper.model")
         load_whisper_model(whisper_model_name)
 
-    for start, end in segments:
-        result = ts(_RAW_AUDIO_FILE, vocal_audio, start, end)
-        all_results.append(result)
+    if use_pool:
+        workers = min(workers, len(segments))
+        all_results = transcribe_segments_in_pool(ts, load_whisper_model, segments, vocal_audio, workers, threads_per_worker(workers))
+    else:
+        all_results = [ts(_RAW_AUDIO_FILE, vocal_audio, start, end) for start, end in segments]
     
     # 5. Combine results
     combined_result = {'segments': []}
@@ -50,6 +75,9 @@ def transcribe():
     # 6. Process df
     df = process_transcription(combined_result)
     save_results(df)
+
+    # 7. Build the word index used by every timestamp alignment
+    load_word_index()
         
 if __name__ == "__main__":
     transcribe()
\ No newline at end of file
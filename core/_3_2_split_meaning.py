@@ -1,47 +1,64 @@
 import concurrent.futures
 from difflib import SequenceMatcher
 import math
-from core.prompts import get_split_prompt
+import threading
+from core.prompts import get_split_prompt, get_batch_split_prompt
 from core.spacy_utils.load_nlp_model import init_nlp
 from core.utils import *
 from rich.console import Console
 from rich.table import Table
 from core.utils.models import _3_1_SPLIT_BY_NLP, _3_2_SPLIT_BY_MEANING
 console = Console()
-
-def tokenize_sentence(sentence, nlp):
-    doc = nlp(sentence)
-    return [token.text for token in doc]
+# spacy pipelines are not guaranteed thread safe, the streaming pipeline tokenizes from worker threads
+NLP_LOCK = threading.Lock()
+
+def count_tokens(sentences, nlp, token_lengths):
+    """Token counts of `sentences`, only texts missing from the `token_lengths` cache are tokenized"""
+    missing = list(dict.fromkeys(sentence for sentence in sentences if sentence not in token_lengths))
+    if missing:
+        # counting only needs the tokenizer, not the tagger / parser
+        with NLP_LOCK:
+            for sentence, doc in zip(missing, nlp.tokenizer.pipe(missing, batch_size=256)):
+                token_lengths[sentence] = len(doc)
+    return [token_lengths[sentence] for sentence in sentences]
+
+SPLIT_TRAILING_PUNCT = ',.!?;:，。！？；：、'
+
+def _map_offset(opcodes, pos):
+    """Map a char offset of the modified text onto the original through the diff opcodes"""
+    for tag, i1, i2, j1, j2 in opcodes:
+        if pos <= j2:
+            if tag == 'equal':
+                return i1 + (pos - j1)
+            # replaced / inserted text, interpolate inside the edited region
+            return i1 + round((pos - j1) * (i2 - i1) / (j2 - j1)) if j2 > j1 else i1
+    return opcodes[-1][2] if opcodes else 0
 
 def find_split_positions(original, modified):
-    split_positions = []
-    parts = modified.split('[br]')
-    start = 0
+    """Align the whole [br]-marked LLM output with the original in one diff and return every split offset."""
     whisper_language = load_key("whisper.language")
     language = load_key("whisper.detected_language") if whisper_language == 'auto' else whisper_language
     joiner = get_joiner(language)
 
-    for i in range(len(parts) - 1):
-        max_similarity = 0
-        best_split = None
-
-        for j in range(start, len(original)):
-            original_left = original[start:j]
-            modified_left = joiner.join(parts[i].split())
-
-            left_similarity = SequenceMatcher(None, original_left, modified_left).ratio()
+    parts = [joiner.join(part.split()) for part in modified.split('[br]')]
+    modified_full = joiner.join(parts)
+    opcodes = SequenceMatcher(None, original, modified_full, autojunk=False).get_opcodes()
 
-            if left_similarity > max_similarity:
-                max_similarity = left_similarity
-                best_split = j
-
-        if max_similarity < 0.9:
-            console.print(f"[yellow]Warning: low similarity found at the best split point: {max_similarity}[/yellow]")
-        if best_split is not None:
-            split_positions.append(best_split)
-            start = best_split
-        else:
-            console.print(f"[yellow]Warning: Unable to find a suitable split point for the {i+1}th part.[/yellow]")
+    split_positions = []
+    start = 0
+    end = 0
+    for i, part in enumerate(parts[:-1]):
+        end += len(part)
+        split = min(max(_map_offset(opcodes, end), start), len(original))
+        # punctuation the LLM dropped at the break still closes the left part
+        while split < len(original) and original[split] in SPLIT_TRAILING_PUNCT:
+            split += 1
+        similarity = SequenceMatcher(None, original[start:split], part, autojunk=False).ratio()
+        if similarity < 0.9:
+            console.print(f"[yellow]Warning: low similarity found at the split point of the {i+1}th part: {similarity}[/yellow]")
+        split_positions.append(split)
+        start = split
+        end += len(joiner)
 
     return split_positions
 
@@ -58,7 +75,10 @@ def split_sentence(sentence, num_parts, word_limit=20, index=-1, retry_attempt=0
     
     response_data = ask_gpt(split_prompt + " " * retry_attempt, resp_type='json', valid_def=valid_split, log_title='split_by_meaning')
     choice = response_data["choice"]
-    best_split = response_data[f"split{choice}"]
+    return apply_split(sentence, response_data[f"split{choice}"], index)
+
+def apply_split(sentence, best_split, index=-1):
+    """Cut the original sentence where the LLM put [br] and return the parts joined by newlines."""
     split_points = find_split_positions(sentence, best_split)
     # split the sentence based on the split points
     for i, split_point in enumerate(split_points):
@@ -80,25 +100,60 @@ def split_sentence(sentence, num_parts, word_limit=20, index=-1, retry_attempt=0
     
     return best_split
 
-def parallel_split_sentences(sentences, max_length, max_workers, nlp, retry_attempt=0):
-    """Split sentences in parallel using a thread pool."""
+def split_sentences_batch(items, word_limit=20, retry_attempt=0):
+    """
+    Split several long sentences in one request, `items` is a list of (index, sentence, num_parts).
+    Items the batch answer gets wrong fall back to the single-sentence request, returns {index: split result}.
+    """
+    def valid_batch(response_data):
+        if not isinstance(response_data.get("results"), list):
+            return {"status": "error", "message": "Missing required key: `results`"}
+        return {"status": "success", "message": "Split completed"}
+
+    splits = {}
+    if len(items) > 1:
+        try:
+            prompt = get_batch_split_prompt([(sentence, num_parts) for _, sentence, num_parts in items], word_limit)
+            response_data = ask_gpt(prompt + " " * retry_attempt, resp_type='json', valid_def=valid_batch, log_title='split_by_meaning_batch')
+            splits = {str(item.get("id")): str(item.get("split", "")) for item in response_data["results"] if isinstance(item, dict)}
+        except Exception as e:
+            console.print(f"[yellow]⚠️ Batch split failed, splitting {len(items)} sentences one by one: {e}[/yellow]")
+
+    results = {}
+    for k, (index, sentence, num_parts) in enumerate(items, 1):
+        split = splits.get(str(k), "")
+        if split.count("[br]") == num_parts - 1:
+            results[index] = apply_split(sentence, split, index)
+        else:
+            results[index] = split_sentence(sentence, num_parts, word_limit, index=index, retry_attempt=retry_attempt)
+    return results
+
+def parallel_split_sentences(sentences, max_length, max_workers, nlp, retry_attempt=0, token_lengths=None):
+    """Split sentences in parallel using a thread pool, `token_lengths` caches token counts between passes."""
     new_sentences = [None] * len(sentences)
     futures = []
+    lengths = count_tokens(sentences, nlp, {} if token_lengths is None else token_lengths)
+
+    batch_size = max(int(load_key("split_batch_size")), 1)
+    long_items = []
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        for index, sentence in enumerate(sentences):
-            # Use tokenizer to split the sentence
-            tokens = tokenize_sentence(sentence, nlp)
-            # print("Tokenization result:", tokens)
-            num_parts = math.ceil(len(tokens) / max_length)
-            if len(tokens) > max_length:
-                future = executor.submit(split_sentence, sentence, num_parts, max_length, index=index, retry_attempt=retry_attempt)
-                futures.append((future, index, num_parts, sentence))
+        for index, (sentence, n_tokens) in enumerate(zip(sentences, lengths)):
+            num_parts = math.ceil(n_tokens / max_length)
+            if n_tokens > max_length:
+                long_items.append((index, sentence, num_parts))
             else:
                 new_sentences[index] = [sentence]
 
-        for future, index, num_parts, sentence in futures:
-            split_result = future.result()
+        for start in range(0, len(long_items), batch_size):
+            futures.append(executor.submit(split_sentences_batch, long_items[start:start + batch_size], max_length, retry_attempt))
+
+        split_results = {}
+        for future in futures:
+            split_results.update(future.result())
+
+        for index, sentence, _ in long_items:
+            split_result = split_results.get(index)
             if split_result:
                 split_lines = split_result.strip().split('\n')
                 new_sentences[index] = [line.strip() for line in split_lines]
@@ -107,17 +162,54 @@ def parallel_split_sentences(sentences, max_length, max_workers, nlp, retry_atte
 
     return [sentence for sublist in new_sentences for sentence in sublist]
 
+def split_in_passes(sentences, max_length, max_workers, nlp):
+    """Up to three split passes until every sentence fits `max_length`, shared by the batch and the streaming mode"""
+    # token counts are kept across passes, only new fragments get tokenized
+    token_lengths = {}
+    # 🔄 process sentences multiple times to ensure all are split
+    for retry_attempt in range(3):
+        if all(n_tokens <= max_length for n_tokens in count_tokens(sentences, nlp, token_lengths)):
+            break
+        sentences = parallel_split_sentences(sentences, max_length=max_length, max_workers=max_workers, nlp=nlp, retry_attempt=retry_attempt, token_lengths=token_lengths)
+    return sentences
+
+def split_until_short(sentence, max_length, nlp):
+    """Run the split passes on a single sentence, so each sentence can be finished independently."""
+    return split_in_passes([sentence], max_length, 1, nlp)
+
+def stream_split_sentences():
+    """Yield split sentences in their original order as soon as each one is finished, and save them at the end."""
+    with open(_3_1_SPLIT_BY_NLP, 'r', encoding='utf-8') as f:
+        sentences = [line.strip() for line in f.readlines()]
+
+    nlp = init_nlp()
+    max_length = load_key("max_split_length")
+    all_sentences = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=load_key("max_workers")) as executor:
+        futures = [executor.submit(split_until_short, sentence, max_length, nlp) for sentence in sentences]
+        for future in futures:
+            for sentence in future.result():
+                all_sentences.append(sentence)
+                yield sentence
+
+    # 💾 save results
+    with open(_3_2_SPLIT_BY_MEANING, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(all_sentences))
+    console.print('[green]✅ All sentences have been successfully split![/green]')
+
 @check_file_exists(_3_2_SPLIT_BY_MEANING)
 def split_sentences_by_meaning():
     """The main function to split sentences by meaning."""
+    if load_key("streaming_translate"):
+        console.print('[yellow]⏩ Streaming translation is on, splitting by meaning will run together with translation.[/yellow]')
+        return
+
     # read input sentences
     with open(_3_1_SPLIT_BY_NLP, 'r', encoding='utf-8') as f:
         sentences = [line.strip() for line in f.readlines()]
 
     nlp = init_nlp()
-    # 🔄 process sentences multiple times to ensure all are split
-    for retry_attempt in range(3):
-        sentences = parallel_split_sentences(sentences, max_length=load_key("max_split_length"), max_workers=load_key("max_workers"), nlp=nlp, retry_attempt=retry_attempt)
+    sentences = split_in_passes(sentences, load_key("max_split_length"), load_key("max_workers"), nlp)
 
     # 💾 save results
     with open(_3_2_SPLIT_BY_MEANING, 'w', encoding='utf-8') as f:
@@ -1,34 +1,35 @@
+import os
 import json
 from core.prompts import get_summary_prompt
 import pandas as pd
 from core.utils import *
-from core.utils.models import _3_2_SPLIT_BY_MEANING, _4_1_TERMINOLOGY
+from core.utils.models import _3_1_SPLIT_BY_NLP, _3_2_SPLIT_BY_MEANING, _4_1_TERMINOLOGY
+from core.utils.llm_scheduler import PRIORITY_HIGH
 
 CUSTOM_TERMS_PATH = 'custom_terms.xlsx'
 
 def combine_chunks():
     """Combine the text chunks identified by whisper into a single long text"""
-    with open(_3_2_SPLIT_BY_MEANING, 'r', encoding='utf-8') as file:
+    # in streaming mode the meaning split is not ready yet, the nlp split holds the same text
+    src_file = _3_2_SPLIT_BY_MEANING if os.path.exists(_3_2_SPLIT_BY_MEANING) else _3_1_SPLIT_BY_NLP
+    with open(src_file, 'r', encoding='utf-8') as file:
         sentences = file.readlines()
     cleaned_sentences = [line.strip() for line in sentences]
     combined_text = ' '.join(cleaned_sentences)
     return combined_text[:load_key('summary_length')]  #! Return only the first x characters
 
-def search_things_to_note_in_prompt(sentence):
-    """Search for terms to note in the given sentence"""
+def format_terms(terms):
+    return '\n'.join(
+        f'{i+1}. "{term["src"]}": "{term["tgt"]}",'
+        f' meaning: {term["note"]}'
+        for i, term in enumerate(terms)
+    )
+
+def get_glossary_prompt():
+    """All terms of the video, the same for every chunk so it can sit in the cached prompt prefix"""
     with open(_4_1_TERMINOLOGY, 'r', encoding='utf-8') as file:
-        things_to_note = json.load(file)
-    things_to_note_list = [term['src'] for term in things_to_note['terms'] if term['src'].lower() in sentence.lower()]
-    if things_to_note_list:
-        prompt = '\n'.join(
-            f'{i+1}. "{term["src"]}": "{term["tgt"]}",'
-            f' meaning: {term["note"]}'
-            for i, term in enumerate(things_to_note['terms'])
-            if term['src'] in things_to_note_list
-        )
-        return prompt
-    else:
-        return None
+        terms = json.load(file)['terms']
+    return format_terms(terms) if terms else None
 
 def get_summary():
     src_content = combine_chunks()
@@ -59,7 +60,7 @@ def get_summary():
                 return {"status": "error", "message": "Invalid response format"}   
         return {"status": "success", "message": "Summary completed"}
 
-    summary = ask_gpt(summary_prompt, resp_type='json', valid_def=valid_summary, log_title='summary')
+    summary = ask_gpt(summary_prompt, resp_type='json', valid_def=valid_summary, log_title='summary', priority=PRIORITY_HIGH)
     summary['terms'].extend(custom_terms_json['terms'])
     
     with open(_4_1_TERMINOLOGY, 'w', encoding='utf-8') as f:
@@ -1,8 +1,10 @@
+import os
 import pandas as pd
 import json
 import concurrent.futures
 from core.translate_lines import translate_lines
-from core._4_1_summarize import search_things_to_note_in_prompt
+from core._3_2_split_meaning import stream_split_sentences
+from core._4_1_summarize import get_glossary_prompt
 from core._8_1_audio_task import check_len_then_trim
 from core._6_gen_sub import align_timestamp
 from core.utils import *
@@ -10,29 +12,54 @@ from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from difflib import SequenceMatcher
 from core.utils.models import *
+from core.utils.llm_scheduler import get_token_counter
+from core.utils.translation_memory import get_translation_memory
 console = Console()
 
 # Function to split text into chunks
-def split_chunks_by_chars(chunk_size, max_i): 
-    """Split text into chunks based on character count, return a list of multi-line text chunks"""
-    with open(_3_2_SPLIT_BY_MEANING, "r", encoding="utf-8") as file:
-        sentences = file.read().strip().split('\n')
-
-    chunks = []
+def iter_chunks(sentences, chunk_size, max_i, count=len):
+    """Group an iterable of sentences into multi-line chunks of at most `chunk_size` (measured by `count`), yielding each chunk as soon as it is full"""
     chunk = ''
+    chunk_len = 0
     sentence_count = 0
     for sentence in sentences:
-        if len(chunk) + len(sentence + '\n') > chunk_size or sentence_count == max_i:
+        sentence_len = count(sentence + '\n')
+        if chunk_len + sentence_len > chunk_size or sentence_count == max_i:
             if chunk.strip():
-                chunks.append(chunk.strip())
+                yield chunk.strip()
             chunk = sentence + '\n'
+            chunk_len = sentence_len
             sentence_count = 1
         else:
             chunk += sentence + '\n'
+            chunk_len += sentence_len
             sentence_count += 1
     if chunk.strip():
-        chunks.append(chunk.strip())
-    return chunks
+        yield chunk.strip()
+
+def load_sentences():
+    with open(_3_2_SPLIT_BY_MEANING, "r", encoding="utf-8") as file:
+        return file.read().strip().split('\n')
+
+# character budget per chunk when the token budget is turned off
+CHAR_CHUNK_SIZE = 600
+
+def split_chunks_by_chars(chunk_size, max_i): 
+    """Split text into chunks based on character count, return a list of multi-line text chunks"""
+    return list(iter_chunks(load_sentences(), chunk_size, max_i))
+
+def iter_chunks_by_tokens(sentences):
+    """Chunk by model tokens with the `translate_chunk` budget, so CJK and latin sources fill requests alike"""
+    max_tokens, max_lines = load_key("translate_chunk.max_tokens"), load_key("translate_chunk.max_lines")
+    if max_tokens <= 0:
+        return iter_chunks(sentences, CHAR_CHUNK_SIZE, max_lines)
+    return iter_chunks(sentences, max_tokens, max_lines, count=get_token_counter(load_key("translate_chunk.tokenizer")))
+
+def split_chunks_by_tokens():
+    """Split text into chunks based on token count, return a list of multi-line text chunks"""
+    if load_key("translate_chunk.max_tokens") <= 0:
+        return split_chunks_by_chars(CHAR_CHUNK_SIZE, load_key("translate_chunk.max_lines"))
+    return list(iter_chunks_by_tokens(load_sentences()))
 
 # Get context from surrounding chunks
 def get_previous_content(chunks, chunk_index):
@@ -41,73 +68,124 @@ def get_after_content(chunks, chunk_index):
     return None if chunk_index == len(chunks) - 1 else chunks[chunk_index + 1].split('\n')[:2] # Get first 2 lines
 
 # 🔍 Translate a single chunk
-def translate_chunk(chunk, chunks, theme_prompt, i):
-    things_to_note_prompt = search_things_to_note_in_prompt(chunk)
+def translate_chunk(chunk, chunks, theme_prompt, glossary_prompt, i):
     previous_content_prompt = get_previous_content(chunks, i)
     after_content_prompt = get_after_content(chunks, i)
-    translation, english_result = translate_lines(chunk, previous_content_prompt, after_content_prompt, things_to_note_prompt, theme_prompt, i)
+    memory = get_translation_memory()
+    if memory is not None:
+        return i, chunk, translate_chunk_with_memory(memory, chunk, previous_content_prompt, after_content_prompt, glossary_prompt, theme_prompt, i)
+    translation, english_result = translate_lines(chunk, previous_content_prompt, after_content_prompt, glossary_prompt, theme_prompt, i)
     return i, english_result, translation
 
+def translate_chunk_with_memory(memory, chunk, previous_content_prompt, after_content_prompt, glossary_prompt, theme_prompt, i):
+    """Reuse remembered translations of identical lines, translate the rest with similar remembered lines as references"""
+    chunk_lines = chunk.split('\n')
+    translations = [memory.lookup(line) for line in chunk_lines]
+    missing = [j for j, translation in enumerate(translations) if translation is None]
+    if not missing:
+        console.print(f"[green]♻️ Block {i} reused from translation memory[/green]")
+        return '\n'.join(translations)
+
+    missing_lines = [chunk_lines[j] for j in missing]
+    references = [memory.lookup_fuzzy(line) for line in missing_lines]
+    reference_prompt = '\n'.join(f'"{src}": "{tgt}"' for src, tgt, _ in filter(None, references)) or None
+    translation, _ = translate_lines('\n'.join(missing_lines), previous_content_prompt, after_content_prompt, glossary_prompt, theme_prompt, i, reference_prompt)
+    new_lines = translation.split('\n')
+    memory.add(zip(missing_lines, new_lines))
+    for j, line in zip(missing, new_lines):
+        translations[j] = line
+    return '\n'.join(translations)
+
 # Add similarity calculation function
 def similar(a, b):
     return SequenceMatcher(None, a, b).ratio()
 
-# 🚀 Main function to translate all chunks
-@check_file_exists(_4_2_TRANSLATION)
-def translate_all():
-    console.print("[bold green]Start Translating All...[/bold green]")
-    chunks = split_chunks_by_chars(chunk_size=600, max_i=10)
-    with open(_4_1_TERMINOLOGY, 'r', encoding='utf-8') as file:
-        theme_prompt = json.load(file).get('theme')
-
+def translate_chunks(chunks, theme_prompt, glossary_prompt):
     # 🔄 Use concurrent execution for translation
     with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
         task = progress.add_task("[cyan]Translating chunks...", total=len(chunks))
         with concurrent.futures.ThreadPoolExecutor(max_workers=load_key("max_workers")) as executor:
             futures = []
             for i, chunk in enumerate(chunks):
-                future = executor.submit(translate_chunk, chunk, chunks, theme_prompt, i)
+                future = executor.submit(translate_chunk, chunk, chunks, theme_prompt, glossary_prompt, i)
                 futures.append(future)
             results = []
             for future in concurrent.futures.as_completed(futures):
                 results.append(future.result())
                 progress.update(task, advance=1)
+    return results
 
-    results.sort(key=lambda x: x[0])  # Sort results based on original order
+def translate_chunks_streaming(theme_prompt, glossary_prompt):
+    """Split by meaning and translate at the same time, a chunk is sent once the next chunk (its after-context) exists"""
+    chunks = []
+    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), transient=True) as progress:
+        task = progress.add_task("[cyan]Splitting and translating chunks...", total=None)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=load_key("max_workers")) as executor:
+            futures = []
+            for chunk in iter_chunks_by_tokens(stream_split_sentences()):
+                chunks.append(chunk)
+                if len(chunks) > 1:
+                    futures.append(executor.submit(translate_chunk, chunks[-2], chunks, theme_prompt, glossary_prompt, len(chunks) - 2))
+            if chunks:
+                futures.append(executor.submit(translate_chunk, chunks[-1], chunks, theme_prompt, glossary_prompt, len(chunks) - 1))
+            progress.update(task, total=len(futures))
+            results = []
+            for future in concurrent.futures.as_completed(futures):
+                results.append(future.result())
+                progress.update(task, advance=1)
+    return chunks, results
+
+def merge_chunk_results(chunks, results):
+    """Put (index, echoed source, translation) results back in chunk order, returns the source and translated lines"""
+    results = {i: (english_result, translation) for i, english_result, translation in results}
     
-    # 💾 Save results to lists and Excel file
     src_text, trans_text = [], []
     for i, chunk in enumerate(chunks):
         chunk_lines = chunk.split('\n')
         src_text.extend(chunk_lines)
+        if i not in results:
+            console.print(f"[yellow]Warning: No matching translation found for chunk {i}[/yellow]")
+            raise ValueError(f"Translation matching failed (chunk {i})")
+        english_result, translation = results[i]
         
-        # Calculate similarity between current chunk and translation results
-        chunk_text = ''.join(chunk_lines).lower()
-        matching_results = [(r, similar(''.join(r[1].split('\n')).lower(), chunk_text)) 
-                          for r in results]
-        best_match = max(matching_results, key=lambda x: x[1])
-        
-        # Check similarity and handle exceptions
-        if best_match[1] < 0.9:
+        # Sanity check the source echoed with the translation, the ratio is only needed if it differs
+        similarity = 1.0 if english_result == chunk else similar(''.join(english_result.split('\n')).lower(), ''.join(chunk_lines).lower())
+        if similarity < 0.9:
             console.print(f"[yellow]Warning: No matching translation found for chunk {i}[/yellow]")
             raise ValueError(f"Translation matching failed (chunk {i})")
-        elif best_match[1] < 1.0:
-            console.print(f"[yellow]Warning: Similar match found (chunk {i}, similarity: {best_match[1]:.3f})[/yellow]")
+        elif similarity < 1.0:
+            console.print(f"[yellow]Warning: Similar match found (chunk {i}, similarity: {similarity:.3f})[/yellow]")
             
-        trans_text.extend(best_match[0][2].split('\n'))
+        trans_text.extend(translation.split('\n'))
+    return src_text, trans_text
+
+# 🚀 Main function to translate all chunks
+@check_file_exists(_4_2_TRANSLATION)
+def translate_all():
+    console.print("[bold green]Start Translating All...[/bold green]")
+    with open(_4_1_TERMINOLOGY, 'r', encoding='utf-8') as file:
+        theme_prompt = json.load(file).get('theme')
+    # the whole glossary instead of per-chunk matches keeps the prompt prefix identical across chunks
+    glossary_prompt = get_glossary_prompt()
+
+    if load_key("streaming_translate") and not os.path.exists(_3_2_SPLIT_BY_MEANING):
+        chunks, results = translate_chunks_streaming(theme_prompt, glossary_prompt)
+    else:
+        chunks = split_chunks_by_tokens()
+        results = translate_chunks(chunks, theme_prompt, glossary_prompt)
+
+    src_text, trans_text = merge_chunk_results(chunks, results)
     
     # Trim long translation text
-    df_text = pd.read_excel(_2_CLEANED_CHUNKS)
-    df_text['text'] = df_text['text'].str.strip('"').str.strip()
     df_translate = pd.DataFrame({'Source': src_text, 'Translation': trans_text})
     subtitle_output_configs = [('trans_subs_for_audio.srt', ['Translation'])]
-    df_time = align_timestamp(df_text, df_translate, subtitle_output_configs, output_dir=None, for_display=False)
+    df_time = align_timestamp(None, df_translate, subtitle_output_configs, output_dir=None, for_display=False)
     console.print(df_time)
     # apply check_len_then_trim to df_time['Translation'], only when duration > MIN_TRIM_DURATION.
     df_time['Translation'] = df_time.apply(lambda x: check_len_then_trim(x['Translation'], x['duration']) if x['duration'] > load_key("min_trim_duration") else x['Translation'], axis=1)
     console.print(df_time)
     
-    df_time.to_excel(_4_2_TRANSLATION, index=False)
+    save_artifact(df_time, _4_2_TRANSLATION)
     console.print("[bold green]✅ Translation completed and results saved.[/bold green]")
 
 if __name__ == '__main__':
@@ -1,9 +1,10 @@
+import numpy as np
 import pandas as pd
 from typing import List, Tuple
 import concurrent.futures
 
-from core._3_2_split_meaning import split_sentence
-from core.prompts import get_align_prompt
+from core._3_2_split_meaning import split_sentence, find_split_positions
+from core.prompts import get_align_prompt, get_split_align_prompt
 from rich.panel import Panel
 from rich.console import Console
 from rich.table import Table
@@ -13,22 +14,32 @@ console = Console()
 
 # ! You can modify your own weights here
 # Chinese and Japanese 2.5 characters, Korean 2 characters, Thai 1.5 characters, full-width symbols 2 characters, other English-based and half-width symbols 1 character
+CHAR_WEIGHTS = np.ones(0x10000)  # other characters (e.g. English and half-width symbols)
+CHAR_WEIGHTS[0x4E00:0x9FFF + 1] = 1.75  # Chinese
+CHAR_WEIGHTS[0x3040:0x30FF + 1] = 1.75  # Japanese
+CHAR_WEIGHTS[0xAC00:0xD7A3 + 1] = 1.5  # Korean
+CHAR_WEIGHTS[0x1100:0x11FF + 1] = 1.5  # Korean
+CHAR_WEIGHTS[0x0E00:0x0E7F + 1] = 1  # Thai
+CHAR_WEIGHTS[0xFF01:0xFF5E + 1] = 1.75  # full-width symbols
+
+def _char_weights(text):
+    codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    # characters beyond the BMP weigh 1
+    return np.where(codes <= 0xFFFF, CHAR_WEIGHTS[np.minimum(codes, 0xFFFF)], 1.0)
+
+def calc_lens(texts) -> np.ndarray:
+    """Weighted length of every text (list or column) in one vectorized pass"""
+    texts = [str(text) for text in texts] # force convert
+    weights = _char_weights(''.join(texts))
+    ends = np.cumsum([len(text) for text in texts], dtype=np.int64)
+    totals = np.concatenate(([0.0], np.cumsum(weights)))
+    return totals[ends] - totals[np.concatenate(([0], ends[:-1]))]
+
 def calc_len(text: str) -> float:
     text = str(text) # force convert
-    def char_weight(char):
-        code = ord(char)
-        if 0x4E00 <= code <= 0x9FFF or 0x3040 <= code <= 0x30FF:  # Chinese and Japanese
-            return 1.75
-        elif 0xAC00 <= code <= 0xD7A3 or 0x1100 <= code <= 0x11FF:  # Korean
-            return 1.5
-        elif 0x0E00 <= code <= 0x0E7F:  # Thai
-            return 1
-        elif 0xFF01 <= code <= 0xFF5E:  # full-width symbols
-            return 1.75
-        else:  # other characters (e.g. English and half-width symbols)
-            return 1
-
-    return sum(char_weight(char) for char in text)
+    if text.isascii():
+        return float(len(text))
+    return float(_char_weights(text).sum())
 
 def align_subs(src_sub: str, tr_sub: str, src_part: str) -> Tuple[List[str], List[str], str]:
     align_prompt = get_align_prompt(src_sub, tr_sub, src_part)
@@ -58,72 +69,117 @@ def align_subs(src_sub: str, tr_sub: str, src_part: str) -> Tuple[List[str], Lis
     
     return src_parts, tr_parts, tr_remerged
 
-def split_align_subs(src_lines: List[str], tr_lines: List[str]):
+def split_align_sub(src_sub: str, tr_sub: str, num_parts: int = 2) -> Tuple[List[str], List[str]]:
+    """Split the source line and align the translation to it in a single request"""
+    prompt = get_split_align_prompt(src_sub, tr_sub, num_parts)
+
+    def valid_split_align(response_data):
+        if 'split' not in response_data or 'align' not in response_data:
+            return {"status": "error", "message": "Missing required key: `split` or `align`"}
+        if str(response_data['split']).count('[br]') != num_parts - 1:
+            return {"status": "error", "message": f"Split does not contain {num_parts - 1} [br] as expected!"}
+        if len(response_data['align']) != num_parts or \
+                any(not str(item.get(f'target_part_{i+1}', '')).strip() for i, item in enumerate(response_data['align'])):
+            return {"status": "error", "message": f"Align does not contain {num_parts} non-empty parts as expected!"}
+        return {"status": "success", "message": "Split and align completed"}
+    parsed = ask_gpt(prompt, resp_type='json', valid_def=valid_split_align, log_title='split_align_subs')
+
+    # cut the original text itself, the model may have touched punctuation or spacing
+    bounds = [0] + find_split_positions(src_sub, parsed['split']) + [len(src_sub)]
+    src_parts = [src_sub[start:end].strip() for start, end in zip(bounds, bounds[1:])]
+    if not all(src_parts):
+        raise ValueError(f"Empty source part after split: {src_parts}")
+    tr_parts = [item[f'target_part_{i+1}'].strip() for i, item in enumerate(parsed['align'])]
+
+    table = Table(title="🔗 Split and aligned parts")
+    table.add_column("Language", style="cyan")
+    table.add_column("Parts", style="magenta")
+    table.add_row("SRC_LANG", "\n".join(src_parts))
+    table.add_row("TARGET_LANG", "\n".join(tr_parts))
+    console.print(table)
+
+    return src_parts, tr_parts
+
+def split_align_line(src: str, tr: str) -> Tuple[List[str], List[str]]:
+    try:
+        return split_align_sub(src, tr)
+    except Exception as e:
+        # fall back to the two-step split then align
+        console.print(f"[yellow]⚠️ Split and align in one request failed, falling back to two requests: {e}[/yellow]")
+        split_src = split_sentence(src, num_parts=2).strip()
+        src_parts, tr_parts, _ = align_subs(src, tr, split_src)
+        if len(src_parts) != len(tr_parts):
+            raise ValueError(f"Aligned {len(tr_parts)} translation parts to {len(src_parts)} source parts")
+        return src_parts, tr_parts
+
+def too_long(src_lines, tr_lines) -> np.ndarray:
     subtitle_set = load_key("subtitle")
     MAX_SUB_LENGTH = subtitle_set["max_length"]
     TARGET_SUB_MULTIPLIER = subtitle_set["target_multiplier"]
-    remerged_tr_lines = tr_lines.copy()
-    
-    to_split = []
-    for i, (src, tr) in enumerate(zip(src_lines, tr_lines)):
-        src, tr = str(src), str(tr)
-        if len(src) > MAX_SUB_LENGTH or calc_len(tr) * TARGET_SUB_MULTIPLIER > MAX_SUB_LENGTH:
-            to_split.append(i)
-            table = Table(title=f"📏 Line {i} needs to be split")
-            table.add_column("Type", style="cyan")
-            table.add_column("Content", style="magenta")
-            table.add_row("Source Line", src)
-            table.add_row("Target Line", tr)
-            console.print(table)
-    
-    @except_handler("Error in split_align_subs")
-    def process(i):
-        split_src = split_sentence(src_lines[i], num_parts=2).strip()
-        src_parts, tr_parts, tr_remerged = align_subs(src_lines[i], tr_lines[i], split_src)
-        src_lines[i] = src_parts
-        tr_lines[i] = tr_parts
-        remerged_tr_lines[i] = tr_remerged
-    
-    with concurrent.futures.ThreadPoolExecutor(max_workers=load_key("max_workers")) as executor:
-        executor.map(process, to_split)
-    
-    # Flatten `src_lines` and `tr_lines`
-    src_lines = [item for sublist in src_lines for item in (sublist if isinstance(sublist, list) else [sublist])]
-    tr_lines = [item for sublist in tr_lines for item in (sublist if isinstance(sublist, list) else [sublist])]
-    
-    return src_lines, tr_lines, remerged_tr_lines
+    src_lens = np.array([len(str(src)) for src in src_lines])
+    return (src_lens > MAX_SUB_LENGTH) | (calc_lens(tr_lines) * TARGET_SUB_MULTIPLIER > MAX_SUB_LENGTH)
+
+def split_align_subs(lines, pending, executor):
+    """
+    Split every pending piece that is still too long, in place.
+    `lines` holds the (src, tr) pieces of each original line, `pending` the (line index, piece) to check.
+    Returns the new pieces and the ones that failed, the only ones the next round has to look at.
+    """
+    flags = too_long([piece[0] for _, piece in pending], [piece[1] for _, piece in pending])
+    to_split = [item for item, flag in zip(pending, flags) if flag]
+    for i, (src, tr) in to_split:
+        table = Table(title=f"📏 Line {i} needs to be split")
+        table.add_column("Type", style="cyan")
+        table.add_column("Content", style="magenta")
+        table.add_row("Source Line", str(src))
+        table.add_row("Target Line", str(tr))
+        console.print(table)
+
+    futures = [executor.submit(split_align_line, src, tr) for _, (src, tr) in to_split]
+    new_pending = []
+    for (i, piece), future in zip(to_split, futures):
+        try:
+            src_parts, tr_parts = future.result()
+        except Exception as e:
+            console.print(f"[red]❌ Error in split_align_subs for line {i}, retrying it in the next attempt: {e}[/red]")
+            new_pending.append((i, piece))
+            continue
+        new_pieces = list(zip(src_parts, tr_parts))
+        k = next(k for k, p in enumerate(lines[i]) if p is piece)
+        lines[i][k:k + 1] = new_pieces
+        new_pending.extend((i, p) for p in new_pieces)
+    return new_pending
 
 def split_for_sub_main():
     console.print("[bold green]🚀 Start splitting subtitles...[/bold green]")
     
-    df = pd.read_excel(_4_2_TRANSLATION)
+    df = load_artifact(_4_2_TRANSLATION)
     src = df['Source'].tolist()
     trans = df['Translation'].tolist()
+
+    # each original line keeps its list of (src, tr) pieces, only new pieces are checked again
+    lines = [[(s, t)] for s, t in zip(src, trans)]
+    pending = [(i, line[0]) for i, line in enumerate(lines)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=load_key("max_workers")) as executor:
+        for attempt in range(3):  # 多次切割
+            console.print(Panel(f"🔄 Split attempt {attempt + 1}, {len(pending)} lines to check", expand=False))
+            pending = split_align_subs(lines, pending, executor)
+            if not pending:
+                break
+    remaining = int(too_long([p[0] for _, p in pending], [p[1] for _, p in pending]).sum()) if pending else 0
+    if remaining:
+        console.print(f"[yellow]⚠️ {remaining} subtitle lines are still longer than the limit after 3 attempts[/yellow]")
+
+    whisper_language = load_key("whisper.language")
+    language = load_key("whisper.detected_language") if whisper_language == 'auto' else whisper_language
+    joiner = get_joiner(language)
+    split_src = [p[0] for line in lines for p in line]
+    split_trans = [p[1] for line in lines for p in line]
+    # remerged keeps one row per original line, with the translation rebuilt from its aligned parts
+    remerged = [line[0][1] if len(line) == 1 else joiner.join(p[1] for p in line) for line in lines]
     
-    subtitle_set = load_key("subtitle")
-    MAX_SUB_LENGTH = subtitle_set["max_length"]
-    TARGET_SUB_MULTIPLIER = subtitle_set["target_multiplier"]
-    
-    for attempt in range(3):  # 多次切割
-        console.print(Panel(f"🔄 Split attempt {attempt + 1}", expand=False))
-        split_src, split_trans, remerged = split_align_subs(src.copy(), trans)
-        
-        # 检查是否所有字幕都符合长度要求
-        if all(len(src) <= MAX_SUB_LENGTH for src in split_src) and \
-           all(calc_len(tr) * TARGET_SUB_MULTIPLIER <= MAX_SUB_LENGTH for tr in split_trans):
-            break
-        
-        # 更新源数据继续下一轮分割
-        src, trans = split_src, split_trans
-
-    # 确保二者有相同的长度，防止报错
-    if len(src) > len(remerged):
-        remerged += [None] * (len(src) - len(remerged))
-    elif len(remerged) > len(src):
-        src += [None] * (len(remerged) - len(src))
-    
-    pd.DataFrame({'Source': split_src, 'Translation': split_trans}).to_excel(_5_SPLIT_SUB, index=False)
-    pd.DataFrame({'Source': src, 'Translation': remerged}).to_excel(_5_REMERGED, index=False)
+    save_artifact(pd.DataFrame({'Source': split_src, 'Translation': split_trans}), _5_SPLIT_SUB)
+    save_artifact(pd.DataFrame({'Source': src, 'Translation': remerged}), _5_REMERGED)
 
 if __name__ == '__main__':
     split_for_sub_main()
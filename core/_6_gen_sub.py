@@ -1,6 +1,9 @@
 import pandas as pd
 import os
 import re
+import json
+import numpy as np
+from difflib import SequenceMatcher
 from rich.panel import Panel
 from rich.console import Console
 import autocorrect_py as autocorrect
@@ -56,59 +59,144 @@ def show_difference(str1, str2):
     print("Position markers: " + "".join("^" if i in diff_positions else " " for i in range(max(len(str1), len(str2)))))
     print(f"Difference indices: {diff_positions}")
 
+def build_word_index(df_words):
+    """Concatenate cleaned words into one string, with the start offset and timestamps of every word"""
+    clean_words = [remove_punctuation(word.lower()) for word in df_words['text']]
+    offsets = np.zeros(len(clean_words), dtype=np.int64)
+    if clean_words:
+        offsets[1:] = np.cumsum([len(w) for w in clean_words[:-1]])
+    starts = df_words['start'].to_numpy(dtype=np.float64)
+    ends = df_words['end'].to_numpy(dtype=np.float64)
+    return ''.join(clean_words), offsets, starts, ends
+
+# ------------
+# persistent word index, built once after ASR and shared by every alignment
+# ------------
+
+_WORD_INDEX_CACHE = None
+
+def _cleaned_chunks_signature():
+    stat = os.stat(artifact_source(_2_CLEANED_CHUNKS))
+    return [stat.st_mtime_ns, stat.st_size]
+
+def load_cleaned_chunks():
+    df_text = load_artifact(_2_CLEANED_CHUNKS)
+    df_text['text'] = df_text['text'].str.strip('"').str.strip()
+    return df_text
+
+def save_word_index(df_words, signature):
+    full_words_str, offsets, starts, ends = build_word_index(df_words)
+    os.makedirs(_2_WORD_INDEX_DIR, exist_ok=True)
+    with open(os.path.join(_2_WORD_INDEX_DIR, 'text.txt'), 'w', encoding='utf-8') as f:
+        f.write(full_words_str)
+    # every build gets its own file names, arrays of an older build may still be memory-mapped
+    version = '-'.join(str(part) for part in signature)
+    files = {}
+    for name, arr in (('offsets', offsets), ('starts', starts), ('ends', ends)):
+        files[name] = f'{name}.{version}.npy'
+        np.save(os.path.join(_2_WORD_INDEX_DIR, files[name]), arr)
+    # meta goes last, a half-written index is never marked valid
+    with open(os.path.join(_2_WORD_INDEX_DIR, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({'source': signature, 'words': len(offsets), 'files': files}, f)
+    for file in os.listdir(_2_WORD_INDEX_DIR):
+        if file.endswith('.npy') and file not in files.values():
+            try:
+                os.remove(os.path.join(_2_WORD_INDEX_DIR, file))
+            except OSError:
+                pass  # still mapped on Windows, removed after the next build
+
+def load_word_index():
+    """Return (text, offsets, starts, ends) for `_2_CLEANED_CHUNKS`, rebuilding the artifact if the chunks changed"""
+    global _WORD_INDEX_CACHE
+    signature = _cleaned_chunks_signature()
+    if _WORD_INDEX_CACHE and _WORD_INDEX_CACHE[0] == signature:
+        return _WORD_INDEX_CACHE[1]
+
+    meta_file = os.path.join(_2_WORD_INDEX_DIR, 'meta.json')
+    meta = None
+    if os.path.exists(meta_file):
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    if not meta or meta.get('source') != signature or 'files' not in meta:
+        _WORD_INDEX_CACHE = None
+        console.print("[cyan]🗂️ Building word index for timestamp alignment...[/cyan]")
+        save_word_index(load_cleaned_chunks(), signature)
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+    with open(os.path.join(_2_WORD_INDEX_DIR, 'text.txt'), 'r', encoding='utf-8') as f:
+        full_words_str = f.read()
+    offsets, starts, ends = (np.load(os.path.join(_2_WORD_INDEX_DIR, meta['files'][name]), mmap_mode='r') for name in ('offsets', 'starts', 'ends'))
+    word_index = (full_words_str, offsets, starts, ends)
+    _WORD_INDEX_CACHE = (signature, word_index)
+    return word_index
+
+def fuzzy_find(full_words_str, clean_sentence, current_pos, min_ratio=0.8):
+    """Locate a slightly edited sentence right after `current_pos`, return (start, end) or None"""
+    sentence_len = len(clean_sentence)
+    window = full_words_str[current_pos:current_pos + sentence_len + max(20, sentence_len // 2)]
+    matcher = SequenceMatcher(None, clean_sentence, window, autojunk=False)
+    # single stray chars often match into the next sentence, only trust longer runs as anchors
+    blocks = [b for b in matcher.get_matching_blocks() if b.size >= min(3, sentence_len)]
+    if not blocks or sum(b.size for b in blocks) < sentence_len * min_ratio:
+        return None
+    return current_pos + blocks[0].b, current_pos + blocks[-1].b + blocks[-1].size
+
 def get_sentence_timestamps(df_words, df_sentences):
+    """Match each sentence to the word stream, `df_words=None` uses the persisted word index"""
     time_stamp_list = []
     
-    # Build complete string and position mapping
-    full_words_str = ''
-    position_to_word_idx = {}
-    
-    for idx, word in enumerate(df_words['text']):
-        clean_word = remove_punctuation(word.lower())
-        start_pos = len(full_words_str)
-        full_words_str += clean_word
-        for pos in range(start_pos, len(full_words_str)):
-            position_to_word_idx[pos] = idx
+    # Complete string and word offset table
+    full_words_str, offsets, starts, ends = load_word_index() if df_words is None else build_word_index(df_words)
+    def word_at(pos):
+        return int(np.searchsorted(offsets, pos, side='right')) - 1
     
     current_pos = 0
     for idx, sentence in df_sentences['Source'].items():
         clean_sentence = remove_punctuation(sentence.lower()).replace(" ", "")
         sentence_len = len(clean_sentence)
-        
-        match_found = False
-        while current_pos <= len(full_words_str) - sentence_len:
-            if full_words_str[current_pos:current_pos+sentence_len] == clean_sentence:
-                start_word_idx = position_to_word_idx[current_pos]
-                end_word_idx = position_to_word_idx[current_pos + sentence_len - 1]
-                
-                time_stamp_list.append((
-                    float(df_words['start'][start_word_idx]),
-                    float(df_words['end'][end_word_idx])
-                ))
-                
-                current_pos += sentence_len
-                match_found = True
-                break
-            current_pos += 1
-            
-        if not match_found:
+
+        if sentence_len == 0:
+            if not full_words_str:
+                # no words to stamp against (e.g. a punctuation-only transcript), keep the previous end
+                prev_end = time_stamp_list[-1][1] if time_stamp_list else 0.0
+                time_stamp_list.append((prev_end, prev_end))
+                continue
+            # punctuation-only line, stamp it at the current position
+            start_word_idx = word_at(min(current_pos, len(full_words_str) - 1))
+            end_word_idx = word_at(max(current_pos - 1, 0))
+            time_stamp_list.append((float(starts[start_word_idx]), float(ends[end_word_idx])))
+            continue
+
+        match_pos = full_words_str.find(clean_sentence, current_pos)
+        if match_pos != -1:
+            span = (match_pos, match_pos + sentence_len)
+        else:
+            span = fuzzy_find(full_words_str, clean_sentence, current_pos)
+            if span:
+                print(f"\n⚠️ Warning: Fuzzy match used for sentence: {sentence}")
+
+        if not span:
             print(f"\n⚠️ Warning: No exact match found for sentence: {sentence}")
             show_difference(clean_sentence, 
                           full_words_str[current_pos:current_pos+len(clean_sentence)])
             print("\nOriginal sentence:", df_sentences['Source'][idx])
             raise ValueError("❎ No match found for sentence.")
+
+        start_word_idx = word_at(span[0])
+        end_word_idx = word_at(span[1] - 1)
+        time_stamp_list.append((
+            float(starts[start_word_idx]),
+            float(ends[end_word_idx])
+        ))
+        current_pos = span[1]
     
     return time_stamp_list
 
 def align_timestamp(df_text, df_translate, subtitle_output_configs: list, output_dir: str, for_display: bool = True):
-    """Align timestamps and add a new timestamp column to df_translate"""
+    """Align timestamps and add a new timestamp column to df_translate, pass `df_text=None` to use the persisted word index"""
     df_trans_time = df_translate.copy()
 
-    # Assign an ID to each word in df_text['text'] and create a new DataFrame
-    words = df_text['text'].str.split(expand=True).stack().reset_index(level=1, drop=True).reset_index()
-    words.columns = ['id', 'word']
-    words['id'] = words['id'].astype(int)
-
     # Process timestamps ⏰
     time_stamp_list = get_sentence_timestamps(df_text, df_translate)
     df_trans_time['timestamp'] = time_stamp_list
@@ -148,16 +236,15 @@ def clean_translation(x):
     return autocorrect.format(cleaned)
 
 def align_timestamp_main():
-    df_text = pd.read_excel(_2_CLEANED_CHUNKS)
-    df_text['text'] = df_text['text'].str.strip('"').str.strip()
-    df_translate = pd.read_excel(_5_SPLIT_SUB)
+    df_text = None # use the persisted word index
+    df_translate = load_artifact(_5_SPLIT_SUB)
     df_translate['Translation'] = df_translate['Translation'].apply(clean_translation)
     
     align_timestamp(df_text, df_translate, SUBTITLE_OUTPUT_CONFIGS, _OUTPUT_DIR)
     console.print(Panel("[bold green]🎉📝 Subtitles generation completed! Please check in the `output` folder 👀[/bold green]"))
 
     # for audio
-    df_translate_for_audio = pd.read_excel(_5_REMERGED) # use remerged file to avoid unmatched lines when dubbing
+    df_translate_for_audio = load_artifact(_5_REMERGED) # use remerged file to avoid unmatched lines when dubbing
     df_translate_for_audio['Translation'] = df_translate_for_audio['Translation'].apply(clean_translation)
     
     align_timestamp(df_text, df_translate_for_audio, AUDIO_SUBTITLE_OUTPUT_CONFIGS, _AUDIO_DIR)
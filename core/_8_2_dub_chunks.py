@@ -2,7 +2,7 @@ import datetime
 import re
 import pandas as pd
 from core._8_1_audio_task import time_diff_seconds
-from core.asr_backend.audio_preprocess import get_audio_duration
+from core.utils.pcm_store import pcm_duration
 from core.tts_backend.estimate_duration import init_estimator, estimate_duration
 from core.utils import *
 from core.utils.models import *
@@ -61,7 +61,7 @@ def analyze_subtitle_timing_and_speed(df):
     if ESTIMATOR is None:
         ESTIMATOR = init_estimator()
     TOLERANCE = load_key("tolerance")
-    whole_dur = get_audio_duration(_RAW_AUDIO_FILE)
+    whole_dur = pcm_duration(_RAW_AUDIO_FILE)
     df['gap'] = 0.0  # Initialize gap column
     for i in range(len(df) - 1):
         current_end = datetime.datetime.strptime(df.loc[i, 'end_time'], '%H:%M:%S.%f').time()
@@ -131,7 +131,7 @@ def process_cutoffs(df):
 
 def gen_dub_chunks():
     rprint("[🎬 Starting] Generating dubbing chunks...")
-    df = pd.read_excel(_8_1_AUDIO_TASK)
+    df = load_artifact(_8_1_AUDIO_TASK)
     
     rprint("[📊 Processing] Analyzing timing and speed...")
     df = analyze_subtitle_timing_and_speed(df)
@@ -199,7 +199,7 @@ def gen_dub_chunks():
             raise ValueError("Matching failed")
 
     # Save results
-    df.to_excel(_8_1_AUDIO_TASK, index=False)
+    save_artifact(df, _8_1_AUDIO_TASK)
     rprint("[✅ Complete] Matching completed successfully!")
 
 if __name__ == "__main__":
@@ -4,9 +4,7 @@ from typing import Dict, List, Tuple
 from pydub import AudioSegment
 from core.utils import *
 from core.utils.models import *
-from pydub import AudioSegment
-from pydub.silence import detect_silence
-from pydub.utils import mediainfo
+from core.utils.pcm_store import decode_to_pcm, pcm_duration, find_silences
 from rich import print as rprint
 
 def normalize_audio_volume(audio_path, output_path, target_db = -20.0, format = "wav"):
@@ -29,6 +27,8 @@ def convert_video_to_audio(video_file: str):
             '-metadata', 'encoding=UTF-8', _RAW_AUDIO_FILE
         ], check=True, stderr=subprocess.PIPE)
         rprint(f"[green]🎬➡️🎵 Converted <{video_file}> to <{_RAW_AUDIO_FILE}> with FFmpeg\n[/green]")
+    # decode once, later stages slice the memory-mapped samples instead of decoding the mp3 again
+    decode_to_pcm(_RAW_AUDIO_FILE)
 
 def get_audio_duration(audio_file: str) -> float:
     """Get the duration of an audio file using ffmpeg."""
@@ -47,10 +47,9 @@ def get_audio_duration(audio_file: str) -> float:
     return duration
 
 def split_audio(audio_file: str, target_len: float = 30*60, win: float = 60) -> List[Tuple[float, float]]:
-    ## 在 [target_len-win, target_len+win] 区间内用 pydub 检测静默，切分音频
+    ## 在 [target_len-win, target_len+win] 区间内检测静默，切分音频，只读取该区间的 pcm 样本
     rprint(f"[blue]🎙️ Starting audio segmentation {audio_file} {target_len} {win}[/blue]")
-    audio = AudioSegment.from_file(audio_file)
-    duration = float(mediainfo(audio_file)["duration"])
+    duration = pcm_duration(audio_file)
     if duration <= target_len + win:
         return [(0, duration)]
     segments, pos = [], 0.0
@@ -61,11 +60,9 @@ def split_audio(audio_file: str, target_len: float = 30*60, win: float = 60) ->
             segments.append((pos, duration)); break
 
         threshold = pos + target_len
-        ws, we = int((threshold - win) * 1000), int((threshold + win) * 1000)
         
         # 获取完整的静默区域
-        silence_regions = detect_silence(audio[ws:we], min_silence_len=int(safe_margin*1000), silence_thresh=-30)
-        silence_regions = [(s/1000 + (threshold - win), e/1000 + (threshold - win)) for s, e in silence_regions]
+        silence_regions = find_silences(audio_file, threshold - win, threshold + win, min_silence_len=safe_margin, silence_thresh=-30)
         # 筛选长度足够（至少1秒）且位置适合的静默区域
         valid_regions = [
             (start, end) for start, end in silence_regions 
@@ -92,6 +89,9 @@ def process_transcription(result: Dict) -> pd.DataFrame:
         speaker_id = segment.get('speaker_id', None)
         
         for word in segment['words']:
+            # word-level speaker labels win over the segment majority vote
+            word_speaker_id = word.get('speaker_id', speaker_id)
+
             # Check word length
             if len(word["word"]) > 30:
                 rprint(f"[yellow]⚠️ Warning: Detected word longer than 30 characters, skipping: {word['word']}[/yellow]")
@@ -123,7 +123,7 @@ def process_transcription(result: Dict) -> pd.DataFrame:
                         'text': word["word"],
                         'start': all_words[-1]['end'],
                         'end': all_words[-1]['end'],
-                        'speaker_id': speaker_id
+                        'speaker_id': word_speaker_id
                     }
                     all_words.append(word_dict)
                 else:
@@ -134,7 +134,7 @@ def process_transcription(result: Dict) -> pd.DataFrame:
                             'text': word["word"],
                             'start': next_word["start"],
                             'end': next_word["end"],
-                            'speaker_id': speaker_id
+                            'speaker_id': word_speaker_id
                         }
                         all_words.append(word_dict)
                     else:
@@ -145,7 +145,7 @@ def process_transcription(result: Dict) -> pd.DataFrame:
                     'text': f'{word["word"]}',
                     'start': word.get('start', all_words[-1]['end'] if all_words else 0),
                     'end': word['end'],
-                    'speaker_id': speaker_id
+                    'speaker_id': word_speaker_id
                 }
                 
                 all_words.append(word_dict)
@@ -183,8 +183,8 @@ def save_results(df: pd.DataFrame):
         df = df[df['text'].str.len() <= 30]
     
     df['text'] = df['text'].apply(lambda x: f'"{x}"')
-    df.to_excel(_2_CLEANED_CHUNKS, index=False)
-    rprint(f"[green]📊 Excel file saved to {_2_CLEANED_CHUNKS}[/green]")
+    save_artifact(df, _2_CLEANED_CHUNKS)
+    rprint(f"[green]📊 Cleaned chunks saved to {_2_CLEANED_CHUNKS}[/green]")
 
 def save_language(language: str):
     update_key("whisper.detected_language", language)
\ No newline at end of file
@@ -3,10 +3,10 @@ import json
 import time
 import requests
 import tempfile
-import librosa
 import soundfile as sf
 from rich import print as rprint
 from core.utils import *
+from core.utils.pcm_store import read_pcm, pcm_duration, SAMPLE_RATE
 
 # ----------------------------------------
 # ISO 639-2 to 1
@@ -71,18 +71,12 @@ def transcribe_audio_elevenlabs(raw_audio_path, vocal_audio_path, start = None,
         with open(LOG_FILE, "r", encoding="utf-8") as f:
             return json.load(f)
     
-    # Load audio and process start/end parameters
-    y, sr = librosa.load(vocal_audio_path, sr=16000)
-    audio_duration = len(y) / sr
-    
+    # Slice the decoded audio based on start/end
     if start is None or end is None:
         start = 0
-        end = audio_duration
-    
-    # Slice audio based on start/end
-    start_sample = int(start * sr)
-    end_sample = int(end * sr)
-    y_slice = y[start_sample:end_sample]
+        end = pcm_duration(vocal_audio_path)
+    y_slice = read_pcm(vocal_audio_path, start, end)
+    sr = SAMPLE_RATE
     
     # Create temporary file for the sliced audio
     with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_file:
@@ -0,0 +1,60 @@
+import os
+import time
+from rich import print as rprint
+from core.utils import *
+from core.utils.pcm_store import read_pcm
+
+# ------------
+# faster-whisper (CTranslate2) runtime for CPU-only machines
+# transcription only: no pyannote diarization, so segments carry no `speaker_id` (use the mlx runtime for speakers)
+# ------------
+
+MODEL_DIR = load_key("model_dir")
+_MODEL = None
+
+def threads_per_worker(workers):
+    """`whisper.cpu_threads_per_worker`, 0 splits all cores evenly across the workers"""
+    threads = int(load_key("whisper.cpu_threads_per_worker"))
+    return threads if threads > 0 else max((os.cpu_count() or 1) // max(workers, 1), 1)
+
+def model_size(model_name):
+    """`mlx-community/whisper-large-v3-turbo` -> `large-v3-turbo`, other names and local paths are kept"""
+    if model_name.startswith('mlx-community/'):
+        return model_name.split('/', 1)[1].removeprefix('whisper-').removesuffix('-mlx')
+    return model_name
+
+def load_whisper_model(model_name, cpu_threads=0):
+    """Load the model once per process, pool workers call this from their initializer"""
+    global _MODEL
+    if _MODEL is None:
+        from faster_whisper import WhisperModel
+        rprint(f"[cyan]📥 Loading faster-whisper model: {model_name} ({load_key('whisper.compute_type')}, {cpu_threads or 'auto'} threads)...[/cyan]")
+        _MODEL = WhisperModel(model_size(model_name), device="cpu", compute_type=load_key("whisper.compute_type"), cpu_threads=cpu_threads, download_root=MODEL_DIR)
+    return _MODEL
+
+def transcribe_audio(raw_audio_file, vocal_audio_file, start, end):
+    """Transcribe one segment on the CPU, timestamps are shifted to the global timeline"""
+    rprint(f"[cyan]🚀 Starting faster-whisper for segment {start:.2f}s to {end:.2f}s...[/cyan]")
+    model = load_whisper_model(load_key("whisper.model"))
+    language = load_key("whisper.language")
+
+    transcribe_start_time = time.time()
+    audio_segment = read_pcm(raw_audio_file, start, end)
+    segments, info = model.transcribe(
+        audio_segment,
+        language=None if language == 'auto' else language,
+        word_timestamps=True,
+        vad_filter=True
+    )
+
+    result = {'language': info.language, 'segments': []}
+    # segments is a generator, decoding happens while iterating
+    for segment in segments:
+        result['segments'].append({
+            'start': segment.start + start,
+            'end': segment.end + start,
+            'text': segment.text,
+            'words': [{'word': w.word, 'start': w.start + start, 'end': w.end + start} for w in (segment.words or [])]
+        })
+    rprint(f"[cyan]⏱️ Transcription time:[/cyan] {time.time() - transcribe_start_time:.2f}s")
+    return result
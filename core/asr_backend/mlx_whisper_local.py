@@ -6,20 +6,56 @@ from pyannote.audio import Pipeline
 from rich import print as rprint
 from core.utils import *
 import numpy as np
-import librosa
+from core.utils.pcm_store import read_pcm, SAMPLE_RATE
+from core.utils.model_registry import ModelRegistry
+from core.asr_backend.speaker_assign import assign_speakers
 
 # Load Hugging Face token from config
 HF_TOKEN = load_key("api.huggingface_token")
 MODEL_DIR = load_key("model_dir")
 
-# Global model cache (internal to mlx-whisper, but we can trigger it)
+# ------------
+# models are loaded once per process and shared by every segment
+# ------------
+
+def _load_whisper():
+    import mlx.core as mx
+    from mlx_whisper.transcribe import ModelHolder
+    # transcribe() reads the same holder, fp16 matches its default decode options
+    return ModelHolder.get_model(load_key("whisper.model"), mx.float16)
+
+def _unload_whisper(model):
+    import mlx.core as mx
+    from mlx_whisper.transcribe import ModelHolder
+    ModelHolder.model, ModelHolder.model_path = None, None
+    mx.metal.clear_cache()
+
+def _load_diarization():
+    pipeline = Pipeline.from_pretrained(
+        "pyannote/speaker-diarization-3.1",
+        use_auth_token=HF_TOKEN
+    )
+    # Move to GPU if available (Metal for Mac is usually handled via 'cpu' or auto in pyannote, 
+    # but pyannote 3.1 often prefers torch device)
+    device = torch.device("mps" if torch.backends.mps.is_available() else "cpu")
+    return pipeline.to(device)
+
+def _unload_diarization(pipeline):
+    if torch.backends.mps.is_available():
+        torch.mps.empty_cache()
+
+MODELS = ModelRegistry(min_free_mb=load_key("model_min_free_mb"))
+MODELS.register("whisper", _load_whisper, _unload_whisper)
+MODELS.register("diarization", _load_diarization, _unload_diarization)
+
 def load_whisper_model(model_name):
-    """Trigger MLX-Whisper's internal ModelHolder cache."""
+    """Warm up the whisper model and the diarization pipeline before the segment loop"""
     rprint(f"[cyan]📥 Ensuring MLX-Whisper model is loaded: {model_name}...[/cyan]")
-    # We use transcribe with a tiny bit of silence to trigger the internal ModelHolder cache
-    # This is a bit of a hack but ensures the model is in memory for subsequent calls.
-    # Alternatively, we just rely on the first call of transcribe_audio to do it.
-    pass
+    MODELS.warmup("whisper")
+    try:
+        MODELS.warmup("diarization")
+    except Exception as e:
+        rprint(f"[yellow]⚠️ Diarization pipeline not loaded yet: {e}[/yellow]")
 
 def transcribe_audio(raw_audio_file, vocal_audio_file, start, end, model=None):
     """
@@ -38,12 +74,11 @@ def transcribe_audio(raw_audio_file, vocal_audio_file, start, end, model=None):
     transcribe_start_time = time.time()
     
     # Load audio segment for MLX
-    audio_segment, _ = librosa.load(raw_audio_file, sr=16000, offset=start, duration=end - start)
+    audio_segment = read_pcm(raw_audio_file, start, end)
     
     rprint("[bold green]🎤 Transcribing with MLX-Whisper...[/bold green]")
-    
-    # MLX-Whisper's internal ModelHolder will handle caching the model weights 
-    # based on the whisper_model_name string.
+    # the registry keeps the weights in mlx-whisper's ModelHolder, transcribe() reuses them
+    MODELS.get("whisper")
 
     result = mlx_whisper.transcribe(
         audio_segment,
@@ -60,48 +95,20 @@ def transcribe_audio(raw_audio_file, vocal_audio_file, start, end, model=None):
     rprint("[bold green]👥 Diarizing with Pyannote-audio...[/bold green]")
     
     try:
-        pipeline = Pipeline.from_pretrained(
-            "pyannote/speaker-diarization-3.1",
-            use_auth_token=HF_TOKEN
-        )
-        # Move to GPU if available (Metal for Mac is usually handled via 'cpu' or auto in pyannote, 
-        # but pyannote 3.1 often prefers torch device)
-        device = torch.device("mps" if torch.backends.mps.is_available() else "cpu")
-        pipeline.to(device)
+        pipeline = MODELS.get("diarization")
         
         # Diarize
         # We need to save the segment to a temporary file because pyannote expects a file path or dict
         # or we can pass the waveform directly
         waveform = torch.from_numpy(audio_segment).unsqueeze(0)
-        diarization = pipeline({"waveform": waveform, "sample_rate": 16000})
+        diarization = pipeline({"waveform": waveform, "sample_rate": SAMPLE_RATE})
         
         diarization_time = time.time() - diarization_start_time
         rprint(f"[cyan]⏱️ Diarization time:[/cyan] {diarization_time:.2f}s")
         
-        # 3. Assign Speakers to Segments
-        # Mapping: for each segment/word in whisper result, find the majority speaker
-        for segment in result['segments']:
-            seg_start = segment['start']
-            seg_end = segment['end']
-            
-            # Find speakers in this time range
-            speakers_in_range = []
-            for turn, _, speaker in diarization.itertracks(yield_label=True):
-                # Check overlap
-                overlap_start = max(seg_start, turn.start)
-                overlap_end = min(seg_end, turn.end)
-                if overlap_end > overlap_start:
-                    speakers_in_range.append((speaker, overlap_end - overlap_start))
-            
-            if speakers_in_range:
-                # Majority vote
-                speaker_durations = {}
-                for spk, dur in speakers_in_range:
-                    speaker_durations[spk] = speaker_durations.get(spk, 0) + dur
-                best_speaker = max(speaker_durations, key=speaker_durations.get)
-                segment['speaker_id'] = best_speaker
-            else:
-                segment['speaker_id'] = "UNKNOWN"
+        # 3. Assign Speakers to segments and words with an interval index over the turns
+        turns = [(turn.start, turn.end, speaker) for turn, _, speaker in diarization.itertracks(yield_label=True)]
+        assign_speakers(result['segments'], turns)
                 
     except Exception as e:
         rprint(f"[red]⚠️ Diarization failed or skipped: {e}[/red]")
@@ -0,0 +1,69 @@
+import numpy as np
+
+# ------------
+# speaker assignment on sorted diarization turns
+# ------------
+
+UNKNOWN_SPEAKER = "UNKNOWN"
+
+class SpeakerIndex:
+    """Per-speaker covered time as a cumulative function, overlap of any interval is two searchsorted lookups"""
+    def __init__(self, turns):
+        # speakers ordered by their first turn, ties in the vote go to the earlier speaker
+        turns = sorted(turns, key=lambda t: (t[0], t[1]))
+        self.speakers = list(dict.fromkeys(speaker for _, _, speaker in turns))
+        self.tables = []
+        for speaker in self.speakers:
+            starts, ends = self._merge([(s, e) for s, e, spk in turns if spk == speaker and e > s])
+            covered = np.concatenate(([0.0], np.cumsum(ends - starts)))
+            self.tables.append((starts, ends, covered))
+
+    @staticmethod
+    def _merge(intervals):
+        # a speaker's own turns may touch or overlap, merge them so no time is counted twice
+        merged = []
+        for start, end in intervals:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        arr = np.array(merged, dtype=np.float64).reshape(-1, 2)
+        return arr[:, 0], arr[:, 1]
+
+    def _covered_until(self, table, t):
+        starts, ends, covered = table
+        if len(starts) == 0:
+            # only zero-length turns, this speaker covers nothing
+            return np.zeros(len(t))
+        k = np.searchsorted(starts, t, side='right') - 1
+        inside = np.clip(t - starts[np.maximum(k, 0)], 0, ends[np.maximum(k, 0)] - starts[np.maximum(k, 0)])
+        return np.where(k >= 0, covered[np.maximum(k, 0)] + inside, 0.0)
+
+    def overlaps(self, starts, ends):
+        """(n_intervals, n_speakers) matrix of overlapping seconds"""
+        starts, ends = np.asarray(starts, dtype=np.float64), np.asarray(ends, dtype=np.float64)
+        if not self.speakers:
+            return np.zeros((len(starts), 0))
+        return np.stack([self._covered_until(table, ends) - self._covered_until(table, starts) for table in self.tables], axis=1)
+
+    def majority(self, starts, ends, default=UNKNOWN_SPEAKER):
+        """Speaker with the longest overlap for every interval, `default` where nobody speaks"""
+        overlaps = self.overlaps(starts, ends)
+        if overlaps.shape[1] == 0:
+            return [default] * len(overlaps)
+        best = overlaps.argmax(axis=1)
+        return [self.speakers[b] if overlaps[i, b] > 0 else default for i, b in enumerate(best)]
+
+def assign_speakers(segments, turns):
+    """Set `speaker_id` on every segment (majority vote) and on every word, words nobody overlaps inherit their segment's speaker"""
+    index = SpeakerIndex(turns)
+    seg_speakers = index.majority([s['start'] for s in segments], [s['end'] for s in segments])
+    for segment, speaker in zip(segments, seg_speakers):
+        segment['speaker_id'] = speaker
+
+    words = [(segment, word) for segment in segments for word in segment.get('words', []) if 'start' in word and 'end' in word]
+    if words:
+        word_speakers = index.majority([w['start'] for _, w in words], [w['end'] for _, w in words], default=None)
+        for (segment, word), speaker in zip(words, word_speakers):
+            word['speaker_id'] = speaker or segment['speaker_id']
+    return segments
@@ -48,6 +48,45 @@ Note: Start you answer with ```json and end with ```, do not add any other text.
     "split": "Complete sentence with [br] tags at split positions"
 }}"""
 
+def get_batch_split_prompt(sentences, word_limit = 20):
+    """`sentences` is a list of (sentence, num_parts)"""
+    language = load_key("whisper.detected_language")
+    items_json = json.dumps([{"id": i + 1, "num_parts": num_parts, "sentence": sentence} for i, (sentence, num_parts) in enumerate(sentences)], ensure_ascii=False, indent=4)
+    results_json = ','.join(f'''
+        {{
+            "id": {i + 1},
+            "split": "Sentence {i + 1} with [br] tags at split positions"
+        }}''' for i in range(len(sentences)))
+    batch_split_prompt = f"""
+## Role
+You are a professional Netflix subtitle splitter in **{language}**.
+
+## Task
+Split each given subtitle text into its **num_parts** parts, each less than **{word_limit}** words.
+
+1. Maintain sentence meaning coherence according to Netflix subtitle standards
+2. MOST IMPORTANT: Keep parts roughly equal in length (minimum 3 words each)
+3. Split at natural points like punctuation marks or conjunctions
+4. If provided text is repeated words, simply split at the middle of the repeated words.
+5. Keep every text unchanged, only insert [br] tags, and handle every id independently
+
+## Given Texts
+<split_these_sentences>
+{items_json}
+</split_these_sentences>
+
+## Output in only JSON format and no other text
+```json
+{{
+    "results": [{results_json}
+    ]
+}}
+```
+
+Note: Start you answer with ```json and end with ```, do not add any other text.
+""".strip()
+    return batch_split_prompt
+
 ## ================================================================
 # @ step4_1_summarize.py
 def get_summary_prompt(source_content, custom_terms_json=None):
@@ -125,23 +164,34 @@ Note: Start you answer with ```json and end with ```, do not add any other text.
 
 ## ================================================================
 # @ step5_translate.py & translate_lines.py
-def generate_shared_prompt(previous_content_prompt, after_content_prompt, summary_prompt, things_to_note_prompt):
-    return f'''### Context Information
+# Translation prompts are built as (prefix, suffix): the prefix (instructions, summary, glossary) is identical
+# for every chunk of a video so providers can reuse its cache, everything chunk-specific goes into the suffix
+def generate_shared_prompt(summary_prompt, things_to_note_prompt):
+    return f'''### Content Summary
+{summary_prompt}
+
+### Points to Note
+{things_to_note_prompt}'''
+
+def generate_context_prompt(previous_content_prompt, after_content_prompt, reference_prompt=None):
+    context_prompt = f'''### Context Information
 <previous_content>
 {previous_content_prompt}
 </previous_content>
 
 <subsequent_content>
 {after_content_prompt}
-</subsequent_content>
+</subsequent_content>'''
+    if reference_prompt:
+        context_prompt += f'''
 
-### Content Summary
-{summary_prompt}
+<reference_translations>
+Translations of similar lines from earlier videos, keep terms and style consistent with them:
+{reference_prompt}
+</reference_translations>'''
+    return context_prompt
 
-### Points to Note
-{things_to_note_prompt}'''
-
-def get_prompt_faithfulness(lines, shared_prompt):
+def get_prompt_faithfulness(lines, shared_prompt, context_prompt):
     TARGET_LANGUAGE = load_key("target_language")
     # Split lines by \n
     line_splits = lines.split('\n')
@@ -152,7 +202,7 @@ def get_prompt_faithfulness(lines, shared_prompt):
     json_format = json.dumps(json_dict, indent=2, ensure_ascii=False)
 
     src_language = load_key("whisper.detected_language")
-    prompt_faithfulness = f'''
+    prefix = f'''
 ## Role
 You are a professional Netflix subtitle translator, fluent in both {src_language} and {TARGET_LANGUAGE}, as well as their respective cultures. 
 Your expertise lies in accurately understanding the semantics and structure of the original {src_language} text and faithfully translating it into {TARGET_LANGUAGE} while preserving the original meaning.
@@ -171,6 +221,9 @@ We have a segment of original {src_language} subtitles that need to be directly
 2. Accurate terminology: Use professional terms correctly and maintain consistency in terminology.
 3. Understand the context: Fully comprehend and reflect the background and contextual relationships of the text.
 </translation_principles>
+'''
+    suffix = f'''
+{context_prompt}
 
 ## INPUT
 <subtitles>
@@ -184,10 +237,10 @@ We have a segment of original {src_language} subtitles that need to be directly
 
 Note: Start you answer with ```json and end with ```, do not add any other text.
 '''
-    return prompt_faithfulness.strip()
+    return prefix.strip(), suffix.strip()
 
 
-def get_prompt_expressiveness(faithfulness_result, lines, shared_prompt):
+def get_prompt_expressiveness(faithfulness_result, lines, shared_prompt, context_prompt):
     TARGET_LANGUAGE = load_key("target_language")
     json_format = {
         key: {
@@ -201,7 +254,7 @@ def get_prompt_expressiveness(faithfulness_result, lines, shared_prompt):
     json_format = json.dumps(json_format, indent=2, ensure_ascii=False)
 
     src_language = load_key("whisper.detected_language")
-    prompt_expressiveness = f'''
+    prefix = f'''
 ## Role
 You are a professional Netflix subtitle translator and language consultant.
 Your expertise lies not only in accurately understanding the original {src_language} but also in optimizing the {TARGET_LANGUAGE} translation to better suit the target language's expression habits and cultural background.
@@ -231,6 +284,9 @@ Please use a two-step thinking process to handle the text line by line:
    - Ensure it's easy for {TARGET_LANGUAGE} audience to understand and accept
    - Adapt the language style to match the theme (e.g., use casual language for tutorials, professional terminology for technical content, formal language for documentaries)
 </Translation Analysis Steps>
+'''
+    suffix = f'''
+{context_prompt}
    
 ## INPUT
 <subtitles>
@@ -244,7 +300,61 @@ Please use a two-step thinking process to handle the text line by line:
 
 Note: Start you answer with ```json and end with ```, do not add any other text.
 '''
-    return prompt_expressiveness.strip()
+    return prefix.strip(), suffix.strip()
+
+
+def get_prompt_fused(lines, shared_prompt, context_prompt):
+    TARGET_LANGUAGE = load_key("target_language")
+    json_dict = {}
+    for i, line in enumerate(lines.split('\n'), 1):
+        json_dict[f"{i}"] = {
+            "origin": line,
+            "direct": f"direct {TARGET_LANGUAGE} translation {i}.",
+            "reflect": "your reflection on direct translation",
+            "free": "your free translation"
+        }
+    json_format = json.dumps(json_dict, indent=2, ensure_ascii=False)
+
+    src_language = load_key("whisper.detected_language")
+    prefix = f'''
+## Role
+You are a professional Netflix subtitle translator and language consultant, fluent in both {src_language} and {TARGET_LANGUAGE}, as well as their respective cultures.
+Your expertise lies in faithfully translating the original {src_language} text and then optimizing the {TARGET_LANGUAGE} translation to suit the target language's expression habits and cultural background.
+
+## Task
+We have a segment of original {src_language} subtitles that need to be translated into {TARGET_LANGUAGE}. These subtitles come from a specific context and may contain specific themes and terminology.
+
+1. Directly translate the original {src_language} subtitles into {TARGET_LANGUAGE} line by line, faithful to the original meaning
+2. Reflect on each direct translation, pointing out existing issues
+3. Perform free translation based on your reflection
+4. Do not add comments or explanations in the translation, as the subtitles are for the audience to read
+5. Do not leave empty lines in the free translation, as the subtitles are for the audience to read
+
+{shared_prompt}
+
+<translation_principles>
+1. Faithful to the original: The direct translation accurately conveys the content and meaning of the original text, without arbitrarily changing, adding, or omitting content.
+2. Accurate terminology: Use professional terms correctly and maintain consistency in terminology.
+3. Understand the context: Fully comprehend and reflect the background and contextual relationships of the text.
+4. Natural expression: The free translation is smooth and natural, conforming to {TARGET_LANGUAGE} expression habits, concise, and matches the style of the theme.
+</translation_principles>
+'''
+    suffix = f'''
+{context_prompt}
+
+## INPUT
+<subtitles>
+{lines}
+</subtitles>
+
+## Output in only JSON format and no other text
+```json
+{json_format}
+```
+
+Note: Start you answer with ```json and end with ```, do not add any other text.
+'''
+    return prefix.strip(), suffix.strip()
 
 
 ## ================================================================
@@ -297,6 +407,52 @@ Note: Start you answer with ```json and end with ```, do not add any other text.
 '''.strip()
     return align_prompt
 
+def get_split_align_prompt(src_sub, tr_sub, num_parts = 2):
+    targ_lang = load_key("target_language")
+    src_lang = load_key("whisper.detected_language")
+    align_parts_json = ','.join(
+        f'''
+        {{
+            "src_part_{i+1}": "Part {i+1} of the {src_lang} subtitle",
+            "target_part_{i+1}": "Corresponding aligned {targ_lang} subtitle part"
+        }}''' for i in range(num_parts)
+    )
+
+    split_align_prompt = f'''
+## Role
+You are a Netflix subtitle splitting and alignment expert fluent in both {src_lang} and {targ_lang}.
+
+## Task
+We have {src_lang} and {targ_lang} original subtitles for a Netflix program that are too long to display.
+Split the {src_lang} subtitle into **{num_parts}** parts, then split the {targ_lang} subtitle the same way so every part stays aligned.
+
+1. Keep the {src_lang} text unchanged, only insert [br] tags at the split positions
+2. MOST IMPORTANT: Keep parts roughly equal in length (minimum 3 words each), split at natural points like punctuation marks or conjunctions
+3. Split the {targ_lang} subtitle according to the word order and structural correspondence with the {src_lang} parts
+4. Never leave empty parts. If it's difficult to split based on meaning, you may appropriately rewrite the {targ_lang} parts
+5. Do not add comments or explanations in the translation, as the subtitles are for the audience to read
+
+## INPUT
+<subtitles>
+{src_lang} Original: "{src_sub}"
+{targ_lang} Original: "{tr_sub}"
+</subtitles>
+
+## Output in only JSON format and no other text
+```json
+{{
+    "analysis": "Brief analysis of the sentence structure and the correspondence between the two subtitles",
+    "split": "The complete {src_lang} subtitle with [br] tags at split positions",
+    "align": [
+        {align_parts_json}
+    ]
+}}
+```
+
+Note: Start you answer with ```json and end with ```, do not add any other text.
+'''.strip()
+    return split_align_prompt
+
 ## ================================================================
 # @ step8_gen_audio_task.py @ step10_gen_audio.py
 def get_subtitle_trim_prompt(text, duration):
@@ -1,13 +1,18 @@
-from .split_by_comma import split_by_comma_main
-from .split_by_connector import split_sentences_main
-from .split_by_mark import split_by_mark
-from .split_long_by_root import split_long_by_root_main
+from .split_by_comma import split_span_by_comma
+from .split_by_connector import split_span_by_connectors
+from .split_by_mark import split_by_mark, split_doc_by_mark
+from .split_long_by_root import split_span_by_root
+from .split_pipeline import split_transcript, parse_transcript, split_doc
 from .load_nlp_model import init_nlp
 
 __all__ = [
-    "split_by_comma_main",
-    "split_sentences_main",
+    "split_span_by_comma",
+    "split_span_by_connectors",
     "split_by_mark",
-    "split_long_by_root_main",
+    "split_doc_by_mark",
+    "split_span_by_root",
+    "split_transcript",
+    "parse_transcript",
+    "split_doc",
     "init_nlp"
 ]
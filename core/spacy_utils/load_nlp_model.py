@@ -28,6 +28,28 @@ def init_nlp():
 # --------------------
 # define the intermediate files
 # --------------------
+NLP_DOC_FILE = "output/log/nlp_doc.spacy"
+# per-stage dumps, only written when `nlp_debug_dumps` is on
 SPLIT_BY_COMMA_FILE = "output/log/split_by_comma.txt"
 SPLIT_BY_CONNECTOR_FILE = "output/log/split_by_connector.txt"
 SPLIT_BY_MARK_FILE = "output/log/split_by_mark.txt"
+
+# --------------------
+# batched parsing
+# --------------------
+NLP_BATCH_SIZE = 256
+# the split rules only read tokens, pos, deps and sentence boundaries
+UNUSED_PIPES = ["ner", "lemmatizer", "textcat"]
+
+def disabled_pipes(nlp, names=UNUSED_PIPES):
+    return nlp.select_pipes(disable=[name for name in names if name in nlp.pipe_names])
+
+def pipe_docs(nlp, texts, disable=UNUSED_PIPES):
+    """Parse texts in batches with `nlp.pipe`, spread over up to `spacy_n_process` processes"""
+    texts = list(texts)
+    # texts are long transcript segments, a worker per segment already pays off
+    n_process = min(max(int(load_key("spacy_n_process")), 1), max(len(texts), 1))
+    # small batches so every worker gets a share of the segments
+    batch_size = min(NLP_BATCH_SIZE, max(-(-len(texts) // n_process), 1))
+    with disabled_pipes(nlp, disable):
+        return list(nlp.pipe(texts, batch_size=batch_size, n_process=n_process))
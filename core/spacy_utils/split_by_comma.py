@@ -1,8 +1,8 @@
 import itertools
-import os
 import warnings
+from spacy.tokens import Doc
 from core.utils import *
-from core.spacy_utils.load_nlp_model import init_nlp, SPLIT_BY_COMMA_FILE, SPLIT_BY_MARK_FILE
+from core.spacy_utils.load_nlp_model import init_nlp
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
@@ -12,9 +12,10 @@ def is_valid_phrase(phrase):
     has_verb = any((token.pos_ == "VERB" or token.pos_ == 'AUX') for token in phrase)
     return (has_subject and has_verb)
 
-def analyze_comma(start, doc, token):
+def analyze_comma(start, doc, token, end=None):
+    end = len(doc) if end is None else end
     left_phrase = doc[max(start, token.i - 9):token.i]
-    right_phrase = doc[token.i + 1:min(len(doc), token.i + 10)]
+    right_phrase = doc[token.i + 1:min(end, token.i + 10)]
     
     suitable_for_splitting = is_valid_phrase(right_phrase) # and is_valid_phrase(left_phrase) # ! no need to chekc left phrase
     
@@ -27,45 +28,28 @@ def analyze_comma(start, doc, token):
 
     return suitable_for_splitting
 
-def split_by_comma(text, nlp):
-    doc = nlp(text)
-    sentences = []
-    start = 0
+def split_span_by_comma(span):
+    """Split a parsed Doc or Span at suitable commas, return the pieces as spans of the same doc"""
+    span = span[:] if isinstance(span, Doc) else span
+    doc, start, end = span.doc, span.start, span.end
+    pieces = []
     
-    for i, token in enumerate(doc):
+    for token in span:
         if token.text == "," or token.text == "，":
-            suitable_for_splitting = analyze_comma(start, doc, token)
+            suitable_for_splitting = analyze_comma(start, doc, token, end)
             
             if suitable_for_splitting:
-                sentences.append(doc[start:token.i].text.strip())
-                rprint(f"[yellow]✂️  Split at comma: {doc[start:token.i][-4:]},| {doc[token.i + 1:][:4]}[/yellow]")
+                pieces.append(doc[start:token.i])
+                rprint(f"[yellow]✂️  Split at comma: {doc[start:token.i][-4:]},| {doc[token.i + 1:end][:4]}[/yellow]")
                 start = token.i + 1
     
-    sentences.append(doc[start:].text.strip())
-    return sentences
-
-def split_by_comma_main(nlp):
-
-    with open(SPLIT_BY_MARK_FILE, "r", encoding="utf-8") as input_file:
-        sentences = input_file.readlines()
-
-    all_split_sentences = []
-    for sentence in sentences:
-        split_sentences = split_by_comma(sentence.strip(), nlp)
-        all_split_sentences.extend(split_sentences)
+    pieces.append(doc[start:end])
+    return pieces
 
-    with open(SPLIT_BY_COMMA_FILE, "w", encoding="utf-8") as output_file:
-        for sentence in all_split_sentences:
-            output_file.write(sentence + "\n")
-    
-    # delete the original file
-    os.remove(SPLIT_BY_MARK_FILE)
-    
-    rprint(f"[green]💾 Sentences split by commas saved to →  `{SPLIT_BY_COMMA_FILE}`[/green]")
+def split_by_comma(text, nlp):
+    return [piece.text.strip() for piece in split_span_by_comma(nlp(text))]
 
 if __name__ == "__main__":
     nlp = init_nlp()
-    split_by_comma_main(nlp)
-    # nlp = init_nlp()
-    # test = "So in the same frame, right there, almost in the exact same spot on the ice, Brown has committed himself, whereas McDavid has not."
-    # print(split_by_comma(test, nlp))
\ No newline at end of file
+    test = "So in the same frame, right there, almost in the exact same spot on the ice, Brown has committed himself, whereas McDavid has not."
+    print(split_by_comma(test, nlp))
\ No newline at end of file
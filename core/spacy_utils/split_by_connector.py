@@ -1,6 +1,6 @@
-import os
 import warnings
-from core.spacy_utils.load_nlp_model import init_nlp, SPLIT_BY_COMMA_FILE, SPLIT_BY_CONNECTOR_FILE
+from spacy.tokens import Doc
+from core.spacy_utils.load_nlp_model import init_nlp
 from core.utils import rprint
 
 warnings.filterwarnings("ignore", category=FutureWarning)
@@ -81,75 +81,43 @@ def analyze_connectors(doc, token):
     else:
         return True, False
 
-def split_by_connectors(text, context_words=5, nlp=None):
-    doc = nlp(text)
-    sentences = [doc.text]  # init
+def split_span_by_connectors(span, context_words=5):
+    """
+    Cut a parsed Doc or Span before connectors, return the pieces as spans of the same doc.
     
-    while True:
-        # Handle each task with a single cut
-        # avoiding the fragmentation of a sentence into multiple parts at the same time.
-        split_occurred = False
-        new_sentences = []
+    One left-to-right pass over the existing parse, each piece starts at the previous cut,
+    so no fragment has to be re-parsed after a split.
+    """
+    span = span[:] if isinstance(span, Doc) else span
+    doc, start, end = span.doc, span.start, span.end
+    pieces = []
+    
+    for token in span:
+        split_before, _ = analyze_connectors(doc, token)
         
-        for sent in sentences:
-            doc = nlp(sent)
-            start = 0
-            
-            for i, token in enumerate(doc):
-                split_before, _ = analyze_connectors(doc, token)
-                
-                if i + 1 < len(doc) and doc[i + 1].text in ["'s", "'re", "'ve", "'ll", "'d"]:
-                    continue
-                
-                left_words = doc[max(0, token.i - context_words):token.i]
-                right_words = doc[token.i+1:min(len(doc), token.i + context_words + 1)]
-                
-                left_words = [word.text for word in left_words if not word.is_punct]
-                right_words = [word.text for word in right_words if not word.is_punct]
-                
-                if len(left_words) >= context_words and len(right_words) >= context_words and split_before:
-                    rprint(f"[yellow]✂️  Split before '{token.text}': {' '.join(left_words)}| {token.text} {' '.join(right_words)}[/yellow]")
-                    new_sentences.append(doc[start:token.i].text.strip())
-                    start = token.i
-                    split_occurred = True
-                    break
-            
-            if start < len(doc):
-                new_sentences.append(doc[start:].text.strip())
+        if token.i + 1 < end and doc[token.i + 1].text in ["'s", "'re", "'ve", "'ll", "'d"]:
+            continue
         
-        if not split_occurred:
-            break
+        left_words = doc[max(start, token.i - context_words):token.i]
+        right_words = doc[token.i+1:min(end, token.i + context_words + 1)]
         
-        sentences = new_sentences
-    
-    return sentences
-
-def split_sentences_main(nlp):
-    # Read input sentences
-    with open(SPLIT_BY_COMMA_FILE, "r", encoding="utf-8") as input_file:
-        sentences = input_file.readlines()
+        left_words = [word.text for word in left_words if not word.is_punct]
+        right_words = [word.text for word in right_words if not word.is_punct]
+        
+        if len(left_words) >= context_words and len(right_words) >= context_words and split_before:
+            rprint(f"[yellow]✂️  Split before '{token.text}': {' '.join(left_words)}| {token.text} {' '.join(right_words)}[/yellow]")
+            pieces.append(doc[start:token.i])
+            start = token.i
     
-    all_split_sentences = []
-    # Process each input sentence
-    for sentence in sentences:
-        split_sentences = split_by_connectors(sentence.strip(), nlp = nlp)
-        all_split_sentences.extend(split_sentences)
+    if start < end:
+        pieces.append(doc[start:end])
     
-    with open(SPLIT_BY_CONNECTOR_FILE, "w+", encoding="utf-8") as output_file:
-        for sentence in all_split_sentences:
-            output_file.write(sentence + "\n")
-        # do not add a newline at the end of the file
-        output_file.seek(output_file.tell() - 1, os.SEEK_SET)
-        output_file.truncate()
+    return pieces
 
-    # delete the original file
-    os.remove(SPLIT_BY_COMMA_FILE)
-    
-    rprint(f"[green]💾 Sentences split by connectors saved to →  `{SPLIT_BY_CONNECTOR_FILE}`[/green]")
+def split_by_connectors(text, context_words=5, nlp=None):
+    return [piece.text.strip() for piece in split_span_by_connectors(nlp(text), context_words)]
 
 if __name__ == "__main__":
     nlp = init_nlp()
-    split_sentences_main(nlp)
-    # nlp = init_nlp()
-    # a = "and show the specific differences that make a difference between a breakaway that results in a goal in the NHL versus one that doesn't."
-    # print(split_by_connectors(a, nlp))
\ No newline at end of file
+    a = "and show the specific differences that make a difference between a breakaway that results in a goal in the NHL versus one that doesn't."
+    print(split_by_connectors(a, nlp=nlp))
\ No newline at end of file
@@ -1,63 +1,68 @@
-import os
-import pandas as pd
 import warnings
-from core.spacy_utils.load_nlp_model import init_nlp, SPLIT_BY_MARK_FILE
+from core.spacy_utils.load_nlp_model import init_nlp, disabled_pipes
 from core.utils.config_utils import load_key, get_joiner
+from core.utils.models import _2_CLEANED_CHUNKS, load_artifact
 from rich import print as rprint
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
-def split_by_mark(nlp):
+def load_transcript_words():
+    """Return the cleaned ASR words and the joiner of the transcript language"""
     whisper_language = load_key("whisper.language")
     language = load_key("whisper.detected_language") if whisper_language == 'auto' else whisper_language # consider force english case
     joiner = get_joiner(language)
     rprint(f"[blue]🔍 Using {language} language joiner: '{joiner}'[/blue]")
-    chunks = pd.read_excel("output/log/cleaned_chunks.xlsx")
+    chunks = load_artifact(_2_CLEANED_CHUNKS)
     chunks.text = chunks.text.apply(lambda x: x.strip('"').strip(""))
-    
-    # join with joiner
-    input_text = joiner.join(chunks.text.to_list())
 
-    doc = nlp(input_text)
+    return chunks.text.to_list(), joiner
+
+def split_doc_by_mark(doc):
+    """Group the parsed sentences of the whole transcript into spans, keeping `-` / `...` continuations together"""
     assert doc.has_annotation("SENT_START")
 
     # skip - and ...
-    sentences_by_mark = []
+    groups = []
     current_sentence = []
-    
+
     # iterate all sentences
     for sent in doc.sents:
         text = sent.text.strip()
-        
+
         # check if the current sentence ends with - or ...
         if current_sentence and (
-            text.startswith('-') or 
+            text.startswith('-') or
             text.startswith('...') or
-            current_sentence[-1].endswith('-') or
-            current_sentence[-1].endswith('...')
+            current_sentence[-1].text.strip().endswith('-') or
+            current_sentence[-1].text.strip().endswith('...')
         ):
-            current_sentence.append(text)
+            current_sentence.append(sent)
         else:
             if current_sentence:
-                sentences_by_mark.append(' '.join(current_sentence))
-                current_sentence = []
-            current_sentence.append(text)
-    
+                groups.append(current_sentence)
+            current_sentence = [sent]
+
     # add the last sentence
     if current_sentence:
-        sentences_by_mark.append(' '.join(current_sentence))
-
-    with open(SPLIT_BY_MARK_FILE, "w", encoding="utf-8") as output_file:
-        for i, sentence in enumerate(sentences_by_mark):
-            if i > 0 and sentence.strip() in [',', '.', '，', '。', '？', '！']:
-                # ! If the current line contains only punctuation, merge it with the previous line, this happens in Chinese, Japanese, etc.
-                output_file.seek(output_file.tell() - 1, os.SEEK_SET)  # Move to the end of the previous line
-                output_file.write(sentence)  # Add the punctuation
-            else:
-                output_file.write(sentence + "\n")
-    
-    rprint(f"[green]💾 Sentences split by punctuation marks saved to →  `{SPLIT_BY_MARK_FILE}`[/green]")
+        groups.append(current_sentence)
+
+    spans = []
+    for group in groups:
+        span = doc[group[0].start:group[-1].end]
+        if spans and span.text.strip() in [',', '.', '，', '。', '？', '！']:
+            # ! If the current span contains only punctuation, merge it with the previous one, this happens in Chinese, Japanese, etc.
+            spans[-1] = doc[spans[-1].start:span.end]
+        else:
+            spans.append(span)
+    return spans
+
+def split_by_mark(nlp):
+    words, joiner = load_transcript_words()
+    # join with joiner
+    with disabled_pipes(nlp):
+        doc = nlp(joiner.join(words))
+    return [span.text.strip() for span in split_doc_by_mark(doc)]
 
 if __name__ == "__main__":
     nlp = init_nlp()
-    split_by_mark(nlp)
+    print(split_by_mark(nlp))
@@ -0,0 +1,103 @@
+import os
+import string
+import hashlib
+import spacy
+from spacy.tokens import Doc, DocBin
+from core.spacy_utils.load_nlp_model import init_nlp, pipe_docs, NLP_DOC_FILE, SPLIT_BY_MARK_FILE, SPLIT_BY_COMMA_FILE, SPLIT_BY_CONNECTOR_FILE
+from core.spacy_utils.split_by_mark import load_transcript_words, split_doc_by_mark
+from core.spacy_utils.split_by_comma import split_span_by_comma
+from core.spacy_utils.split_by_connector import split_span_by_connectors
+from core.spacy_utils.split_long_by_root import split_span_by_root
+from core.utils import *
+from core.utils.models import _3_1_SPLIT_BY_NLP
+
+# --------------------
+# split rules, each maps one span to a list of spans of the same doc
+# --------------------
+SPLIT_RULES = [
+    ("comma", split_span_by_comma, SPLIT_BY_COMMA_FILE),
+    ("connector", split_span_by_connectors, SPLIT_BY_CONNECTOR_FILE),
+    ("root", split_span_by_root, None),
+]
+
+# --------------------
+# parse the transcript once
+# --------------------
+SEGMENT_CHARS = 5000
+SENTENCE_ENDS = ('.', '?', '!', '。', '？', '！')
+
+def _segments(words, joiner):
+    # cut only after sentence-final words so each segment parses like the full text
+    segment, size = [], 0
+    for word in words:
+        segment.append(word)
+        size += len(word) + len(joiner)
+        if size >= SEGMENT_CHARS and word.endswith(SENTENCE_ENDS) and not word.endswith('...'):
+            yield joiner.join(segment)
+            segment, size = [], 0
+    if segment:
+        yield joiner.join(segment)
+
+def _doc_key(nlp, text):
+    raw = f"{nlp.meta.get('lang')}_{nlp.meta.get('name')}_{nlp.meta.get('version')}_{spacy.__version__}\n{text}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def parse_transcript(nlp):
+    """Parse the whole transcript into one Doc, reusing the DocBin from a previous run of the same text and model"""
+    words, joiner = load_transcript_words()
+    key = _doc_key(nlp, joiner.join(words))
+    if os.path.exists(NLP_DOC_FILE):
+        docs = list(DocBin().from_disk(NLP_DOC_FILE).get_docs(nlp.vocab))
+        if docs and docs[0].user_data.get("source") == key:
+            rprint(f"[blue]♻️ Reusing parsed transcript from `{NLP_DOC_FILE}`[/blue]")
+            return docs[0]
+
+    rprint("[blue]⏳ Parsing transcript with spaCy...[/blue]")
+    docs = pipe_docs(nlp, _segments(words, joiner))
+    doc = Doc.from_docs(docs, ensure_whitespace=bool(joiner)) if len(docs) > 1 else docs[0]
+    doc.user_data["source"] = key
+    doc_bin = DocBin(store_user_data=True)
+    doc_bin.add(doc)
+    os.makedirs(os.path.dirname(NLP_DOC_FILE), exist_ok=True)
+    doc_bin.to_disk(NLP_DOC_FILE)
+    return doc
+
+# --------------------
+# run all split rules in memory
+# --------------------
+
+def _dump(spans, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(span.text.strip() for span in spans))
+
+def split_doc(doc, rules=SPLIT_RULES, debug=False):
+    """Split the parsed transcript by marks, then pass the spans through every rule in order"""
+    spans = split_doc_by_mark(doc)
+    if debug:
+        _dump(spans, SPLIT_BY_MARK_FILE)
+    for name, rule, dump_file in rules:
+        spans = [piece for span in spans for piece in rule(span)]
+        if debug and dump_file:
+            _dump(spans, dump_file)
+    return spans
+
+def save_sentences(spans):
+    punctuation = string.punctuation + "'" + '"'  # include all punctuation and apostrophe ' and "
+
+    with open(_3_1_SPLIT_BY_NLP, "w", encoding="utf-8") as output_file:
+        for i, span in enumerate(spans):
+            sentence = span.text.strip()
+            if not sentence or all(char in punctuation for char in sentence):
+                rprint(f"[yellow]⚠️  Warning: Empty or punctuation-only line detected at index {i}[/yellow]")
+                continue
+            output_file.write(sentence + "\n")
+
+    rprint(f"[green]💾 Sentences split by NLP saved to →  {_3_1_SPLIT_BY_NLP}[/green]")
+
+def split_transcript(nlp):
+    doc = parse_transcript(nlp)
+    save_sentences(split_doc(doc, debug=load_key("nlp_debug_dumps")))
+
+if __name__ == "__main__":
+    nlp = init_nlp()
+    split_transcript(nlp)
@@ -60,7 +60,8 @@ def page_setting():
                 update_key("whisper.language", langs[lang])
                 st.rerun()
 
-        runtime = st.selectbox(t("Whisper Runtime"), options=["mlx", "elevenlabs"], index=["mlx", "elevenlabs"].index(load_key("whisper.runtime")) if load_key("whisper.runtime") in ["mlx", "elevenlabs"] else 0, help=t("MLX is highly recommended for Apple Silicon (M1/M2/M3)."))
+        runtimes = ["mlx", "faster_whisper", "elevenlabs"]
+        runtime = st.selectbox(t("Whisper Runtime"), options=runtimes, index=runtimes.index(load_key("whisper.runtime")) if load_key("whisper.runtime") in runtimes else 0, help=t("MLX is highly recommended for Apple Silicon (M1/M2/M3)."))
         if runtime != load_key("whisper.runtime"):
             update_key("whisper.runtime", runtime)
             st.rerun()
@@ -1,4 +1,4 @@
-from core.prompts import generate_shared_prompt, get_prompt_faithfulness, get_prompt_expressiveness
+from core.prompts import generate_shared_prompt, generate_context_prompt, get_prompt_faithfulness, get_prompt_expressiveness, get_prompt_fused
 from rich.panel import Panel
 from rich.console import Console
 from rich.table import Table
@@ -18,37 +18,46 @@ def valid_translate_result(result: dict, required_keys: list, required_sub_keys:
 
     return {"status": "success", "message": "Translation completed"}
 
-def translate_lines(lines, previous_content_prompt, after_cotent_prompt, things_to_note_prompt, summary_prompt, index = 0):
+def translate_lines(lines, previous_content_prompt, after_cotent_prompt, things_to_note_prompt, summary_prompt, index = 0, reference_prompt = None):
     if not lines or not lines.strip():
         return "", ""
-    shared_prompt = generate_shared_prompt(previous_content_prompt, after_cotent_prompt, summary_prompt, things_to_note_prompt)
+    shared_prompt = generate_shared_prompt(summary_prompt, things_to_note_prompt)
+    context_prompt = generate_context_prompt(previous_content_prompt, after_cotent_prompt, reference_prompt)
 
     # Retry translation if the length of the original text and the translated text are not the same, or if the specified key is missing
-    def retry_translation(prompt, length, step_name):
-        def valid_faith(response_data):
-            return valid_translate_result(response_data, [str(i) for i in range(1, length+1)], ['direct'])
-        def valid_express(response_data):
-            return valid_translate_result(response_data, [str(i) for i in range(1, length+1)], ['free'])
-        for retry in range(3):
-            if step_name == 'faithfulness':
-                result = ask_gpt(prompt+retry* " ", resp_type='json', valid_def=valid_faith, log_title=f'translate_{step_name}')
-            elif step_name == 'expressiveness':
-                result = ask_gpt(prompt+retry* " ", resp_type='json', valid_def=valid_express, log_title=f'translate_{step_name}')
+    def retry_translation(prompt, length, step_name, attempts=3):
+        prefix, suffix = prompt
+        required_sub_keys = {'faithfulness': ['direct'], 'expressiveness': ['free'], 'fused': ['direct', 'free']}[step_name]
+        def valid_result(response_data):
+            return valid_translate_result(response_data, [str(i) for i in range(1, length+1)], required_sub_keys)
+        for retry in range(attempts):
+            result = ask_gpt(suffix+retry* " ", resp_type='json', valid_def=valid_result, log_title=f'translate_{step_name}', system_prompt=prefix)
             if len(lines.split('\n')) == len(result):
                 return result
-            if retry != 2:
+            if retry != attempts - 1:
                 console.print(f'[yellow]⚠️ {step_name.capitalize()} translation of block {index} failed, Retry...[/yellow]')
-        raise ValueError(f'[red]❌ {step_name.capitalize()} translation of block {index} failed after 3 retries. Please check `output/gpt_log/error.json` for more details.[/red]')
+        raise ValueError(f'[red]❌ {step_name.capitalize()} translation of block {index} failed after {attempts} retries. Please check `output/gpt_log/error.jsonl` for more details.[/red]')
+
+    reflect_translate = load_key('reflect_translate')
+    express_result = None
+    if reflect_translate and load_key('fused_translate'):
+        ## Step 1 + 2 in one request, blocks that fail fall back to the two requests below
+        try:
+            express_result = retry_translation(get_prompt_fused(lines, shared_prompt, context_prompt), len(lines.split('\n')), 'fused', attempts=1)
+        except Exception as e:
+            console.print(f'[yellow]⚠️ Fused translation of block {index} failed, falling back to two steps: {e}[/yellow]')
 
     ## Step 1: Faithful to the Original Text
-    prompt1 = get_prompt_faithfulness(lines, shared_prompt)
-    faith_result = retry_translation(prompt1, len(lines.split('\n')), 'faithfulness')
+    if express_result:
+        faith_result = express_result
+    else:
+        prompt1 = get_prompt_faithfulness(lines, shared_prompt, context_prompt)
+        faith_result = retry_translation(prompt1, len(lines.split('\n')), 'faithfulness')
 
     for i in faith_result:
         faith_result[i]["direct"] = faith_result[i]["direct"].replace('\n', ' ')
 
     # If reflect_translate is False or not set, use faithful translation directly
-    reflect_translate = load_key('reflect_translate')
     if not reflect_translate:
         # If reflect_translate is False or not set, use faithful translation directly
         translate_result = "\n".join([faith_result[i]["direct"].strip() for i in faith_result])
@@ -65,8 +74,9 @@ def translate_lines(lines, previous_content_prompt, after_cotent_prompt, things_
         return translate_result, lines
 
     ## Step 2: Express Smoothly  
-    prompt2 = get_prompt_expressiveness(faith_result, lines, shared_prompt)
-    express_result = retry_translation(prompt2, len(lines.split('\n')), 'expressiveness')
+    if not express_result:
+        prompt2 = get_prompt_expressiveness(faith_result, lines, shared_prompt, context_prompt)
+        express_result = retry_translation(prompt2, len(lines.split('\n')), 'expressiveness')
 
     table = Table(title="Translation Results", show_header=False, box=box.ROUNDED)
     table.add_column("Translations", style="bold")
@@ -82,7 +92,7 @@ def translate_lines(lines, previous_content_prompt, after_cotent_prompt, things_
     translate_result = "\n".join([express_result[i]["free"].replace('\n', ' ').strip() for i in express_result])
 
     if len(lines.split('\n')) != len(translate_result.split('\n')):
-        console.print(Panel(f'[red]❌ Translation of block {index} failed, Length Mismatch, Please check `output/gpt_log/translate_expressiveness.json`[/red]'))
+        console.print(Panel(f'[red]❌ Translation of block {index} failed, Length Mismatch, Please check `output/gpt_log/translate_expressiveness.jsonl`[/red]'))
         raise ValueError(f'Origin ···{lines}···,\nbut got ···{translate_result}···')
 
     return translate_result, lines
@@ -1,6 +1,6 @@
 # use try-except to avoid error when installing
 try:
-    from .ask_gpt import ask_gpt
+    from .ask_gpt import ask_gpt, ask_gpt_async
     from .decorator import except_handler, check_file_exists
     from .config_utils import load_key, update_key, get_joiner
     from .video_utils import get_video_info
@@ -9,4 +9,4 @@ except ImportError:
     import traceback
     traceback.print_exc()
 
-__all__ = ["ask_gpt", "except_handler", "check_file_exists", "load_key", "update_key", "rprint", "get_joiner", "get_video_info"]
\ No newline at end of file
+__all__ = ["ask_gpt", "ask_gpt_async", "except_handler", "check_file_exists", "load_key", "update_key", "rprint", "get_joiner", "get_video_info"]
\ No newline at end of file
@@ -1,11 +1,15 @@
 import os
 import json
+import hashlib
+import asyncio
 from threading import Lock
+import httpx
 import json_repair
-from openai import OpenAI
+from openai import AsyncOpenAI, RateLimitError
 from core.utils.config_utils import load_key
 from rich import print as rprint
 from core.utils.decorator import except_handler
+from core.utils.llm_scheduler import LLMScheduler, PRIORITY_NORMAL, estimate_tokens, run_in_engine, await_in_engine
 
 # ------------
 # cache gpt response
@@ -14,60 +18,199 @@ from core.utils.decorator import except_handler
 LOCK = Lock()
 GPT_LOG_FOLDER = 'output/gpt_log'
 
-def _save_cache(model, prompt, resp_content, resp_type, resp, message=None, log_title="default"):
-    with LOCK:
-        logs = []
-        file = os.path.join(GPT_LOG_FOLDER, f"{log_title}.json")
-        os.makedirs(os.path.dirname(file), exist_ok=True)
-        if os.path.exists(file):
-            with open(file, 'r', encoding='utf-8') as f:
-                logs = json.load(f)
-        logs.append({"model": model, "prompt": prompt, "resp_content": resp_content, "resp_type": resp_type, "resp": resp, "message": message})
-        with open(file, 'w', encoding='utf-8') as f:
-            json.dump(logs, f, ensure_ascii=False, indent=4)
-
-def _load_cache(prompt, resp_type, log_title):
-    with LOCK:
-        file = os.path.join(GPT_LOG_FOLDER, f"{log_title}.json")
-        if os.path.exists(file):
-            with open(file, 'r', encoding='utf-8') as f:
-                for item in json.load(f):
-                    if item["prompt"] == prompt and item["resp_type"] == resp_type:
-                        return item["resp"]
-        return False
+def _cache_key(model, prompt, resp_type, system=None):
+    raw = json.dumps([model, prompt, resp_type] + ([system] if system else []), ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+class _CacheStore:
+    """Append-only jsonl log of one `log_title` with an in-memory hash index"""
+    def __init__(self, log_title):
+        self.file = os.path.join(GPT_LOG_FOLDER, f"{log_title}.jsonl")
+        self.legacy_file = os.path.join(GPT_LOG_FOLDER, f"{log_title}.json")
+        self.lock = Lock()
+        self.index = {}
+        self.signature = None
+        with self.lock:
+            self._reload()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size)
+
+    def _migrate_legacy(self):
+        # old versions kept the whole log as one json array
+        if os.path.exists(self.file) or not os.path.exists(self.legacy_file):
+            return
+        with open(self.legacy_file, 'r', encoding='utf-8') as f:
+            logs = json.load(f)
+        with open(self.file, 'w', encoding='utf-8') as f:
+            for item in logs:
+                f.write(json.dumps(item, ensure_ascii=False) + '\n')
+        os.remove(self.legacy_file)
+        rprint(f"[blue]📦 Migrated {len(logs)} cached responses to `{self.file}`[/blue]")
+
+    def _reload(self):
+        self._migrate_legacy()
+        index = {}
+        if os.path.exists(self.file):
+            with open(self.file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # half-written line from an interrupted run
+                    index.setdefault(_cache_key(item["model"], item["prompt"], item["resp_type"], item.get("system")), item["resp"])
+        self.index = index
+        self.signature = self._stat()
+
+    def get(self, key):
+        if self._stat() != self.signature:
+            # the log was removed or changed outside this process
+            with self.lock:
+                if self._stat() != self.signature:
+                    self._reload()
+        return self.index.get(key)
+
+    def append(self, key, item):
+        with self.lock:
+            if self._stat() != self.signature:
+                self._reload()
+            os.makedirs(os.path.dirname(self.file), exist_ok=True)
+            with open(self.file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(item, ensure_ascii=False) + '\n')
+            self.index.setdefault(key, item["resp"])
+            self.signature = self._stat()
+
+_STORES = {}
+
+def _get_store(log_title):
+    store = _STORES.get(log_title)
+    if store is None:
+        with LOCK:
+            store = _STORES.get(log_title)
+            if store is None:
+                store = _STORES[log_title] = _CacheStore(log_title)
+    return store
+
+def _save_cache(model, prompt, resp_content, resp_type, resp, message=None, log_title="default", system=None):
+    item = {"model": model, "prompt": prompt, "resp_content": resp_content, "resp_type": resp_type, "resp": resp, "message": message}
+    if system:
+        item["system"] = system
+    _get_store(log_title).append(_cache_key(model, prompt, resp_type, system), item)
+
+def _load_cache(model, prompt, resp_type, log_title, system=None):
+    cached = _get_store(log_title).get(_cache_key(model, prompt, resp_type, system))
+    return cached if cached is not None else False
+
+# ------------
+# reuse openai clients
+# ------------
+
+_CLIENTS = {}
+
+def _normalize_base_url(base_url):
+    if 'ark' in base_url:
+        return "https://ark.cn-beijing.volces.com/api/v3" # huoshan base url
+    elif 'v1' not in base_url:
+        return base_url.strip('/') + '/v1'
+    return base_url
+
+def _get_client(base_url, api_key):
+    """One keep-alive client per endpoint, shared by all stages and threads (lives on the engine loop)"""
+    pool_size = max(int(load_key("max_workers")), 1)
+    client_key = (base_url, api_key, pool_size)
+    client = _CLIENTS.get(client_key)
+    if client is None:
+        with LOCK:
+            client = _CLIENTS.get(client_key)
+            if client is None:
+                # leave headroom for nested calls such as trimming inside translation workers
+                limits = httpx.Limits(max_connections=pool_size * 2, max_keepalive_connections=pool_size, keepalive_expiry=60)
+                http_client = httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(300, connect=10))
+                # 429s are retried by the shared scheduler instead of the sdk
+                client = AsyncOpenAI(api_key=api_key, base_url=_normalize_base_url(base_url), http_client=http_client, max_retries=0)
+                _CLIENTS[client_key] = client
+    return client
+
+# ------------
+# global rate limiting
+# ------------
+
+_SCHEDULERS = {}
+RATE_LIMIT_RETRY = 5
+
+def _get_scheduler():
+    """One scheduler for every stage, rebuilt only if the limits in config change"""
+    scheduler_key = (max(int(load_key("max_workers")), 1), load_key("api.rpm"), load_key("api.tpm"))
+    if scheduler_key not in _SCHEDULERS:
+        _SCHEDULERS.clear()
+        _SCHEDULERS[scheduler_key] = LLMScheduler(*scheduler_key)
+    return _SCHEDULERS[scheduler_key]
+
+def _retry_after(error):
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+async def _create_completion(client, params, priority):
+    scheduler = _get_scheduler()
+    est_tokens = sum(estimate_tokens(message["content"]) for message in params["messages"])
+    for attempt in range(RATE_LIMIT_RETRY + 1):
+        await scheduler.acquire(est_tokens, priority)
+        try:
+            resp_raw = await client.chat.completions.create(**params)
+        except RateLimitError as e:
+            await scheduler.release(rate_limited=True, retry_after=_retry_after(e))
+            if attempt == RATE_LIMIT_RETRY:
+                raise
+            continue
+        except BaseException:
+            await scheduler.release()
+            raise
+        usage = getattr(resp_raw, "usage", None)
+        # settle the estimate with the real usage, over-estimates are refunded to the tpm bucket
+        used_tokens = usage.total_tokens - est_tokens if usage and usage.total_tokens else 0
+        await scheduler.release(used_tokens=used_tokens)
+        return resp_raw
 
 # ------------
 # ask gpt once
 # ------------
 
-@except_handler("GPT request failed", retry=5)
-def ask_gpt(prompt, resp_type=None, valid_def=None, log_title="default"):
+def _build_messages(prompt, system_prompt):
+    """Shared prefix first so providers can reuse its cache, as a system message only if `api.system_prefix` is on"""
+    if not system_prompt:
+        return prompt, None, [{"role": "user", "content": prompt}]
+    if load_key("api.system_prefix"):
+        return prompt, system_prompt, [{"role": "system", "content": system_prompt}, {"role": "user", "content": prompt}]
+    prompt = f"{system_prompt}\n\n{prompt}"
+    return prompt, None, [{"role": "user", "content": prompt}]
+
+async def _ask_gpt_once(prompt, resp_type, valid_def, log_title, priority, system_prompt=None):
     if not load_key("api.key"):
         raise ValueError("API key is not set")
+    model = load_key("api.model")
+    prompt, system, messages = _build_messages(prompt, system_prompt)
     # check cache
-    cached = _load_cache(prompt, resp_type, log_title)
+    cached = await asyncio.to_thread(_load_cache, model, prompt, resp_type, log_title, system)
     if cached:
         rprint("use cache response")
         return cached
 
-    model = load_key("api.model")
-    base_url = load_key("api.base_url")
-    if 'ark' in base_url:
-        base_url = "https://ark.cn-beijing.volces.com/api/v3" # huoshan base url
-    elif 'v1' not in base_url:
-        base_url = base_url.strip('/') + '/v1'
-    client = OpenAI(api_key=load_key("api.key"), base_url=base_url)
+    client = _get_client(load_key("api.base_url"), load_key("api.key"))
     response_format = {"type": "json_object"} if resp_type == "json" and load_key("api.llm_support_json") else None
 
-    messages = [{"role": "user", "content": prompt}]
-
     params = dict(
         model=model,
         messages=messages,
         response_format=response_format,
         timeout=300
     )
-    resp_raw = client.chat.completions.create(**params)
+    resp_raw = await _create_completion(client, params, priority)
 
     # process and return full result
     resp_content = resp_raw.choices[0].message.content
@@ -80,12 +223,21 @@ def ask_gpt(prompt, resp_type=None, valid_def=None, log_title="default"):
     if valid_def:
         valid_resp = valid_def(resp)
         if valid_resp['status'] != 'success':
-            _save_cache(model, prompt, resp_content, resp_type, resp, log_title="error", message=valid_resp['message'])
+            await asyncio.to_thread(_save_cache, model, prompt, resp_content, resp_type, resp, log_title="error", message=valid_resp['message'], system=system)
             raise ValueError(f"❎ API response error: {valid_resp['message']}")
 
-    _save_cache(model, prompt, resp_content, resp_type, resp, log_title=log_title)
+    await asyncio.to_thread(_save_cache, model, prompt, resp_content, resp_type, resp, log_title=log_title, system=system)
     return resp
 
+@except_handler("GPT request failed", retry=5)
+async def ask_gpt_async(prompt, resp_type=None, valid_def=None, log_title="default", priority=PRIORITY_NORMAL, system_prompt=None):
+    return await await_in_engine(_ask_gpt_once(prompt, resp_type, valid_def, log_title, priority, system_prompt))
+
+@except_handler("GPT request failed", retry=5)
+def ask_gpt(prompt, resp_type=None, valid_def=None, log_title="default", priority=PRIORITY_NORMAL, system_prompt=None):
+    # sync shim: every thread funnels into the shared engine loop and scheduler
+    return run_in_engine(_ask_gpt_once(prompt, resp_type, valid_def, log_title, priority, system_prompt))
+
 
 if __name__ == '__main__':
     from rich import print as rprint
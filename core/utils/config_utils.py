@@ -29,6 +29,55 @@ ENV_MAPPING = {
     "f5tts.302_api": "F5TTS_302_API"
 }
 
+# -----------------------
+# parsed config cache
+# -----------------------
+
+# (signature, data, index) snapshot, replaced as a whole so readers never need the lock
+_config_cache = None
+
+def _config_signature():
+    stat = os.stat(CONFIG_PATH)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _to_plain(value):
+    """New plain dicts and lists for config containers, callers may modify them without touching the shared cache"""
+    if isinstance(value, dict):
+        return {k: _to_plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_plain(v) for v in value]
+    return value
+
+def _build_index(data, prefix=''):
+    """Flatten nested config into a {'a.b.c': value} lookup table"""
+    index = {}
+    if isinstance(data, dict):
+        for k, v in data.items():
+            full_key = f"{prefix}.{k}" if prefix else str(k)
+            index[full_key] = _to_plain(v)
+            index.update(_build_index(v, full_key))
+    return index
+
+def _store_cache(signature, data):
+    global _config_cache
+    _config_cache = (signature, data, _build_index(data))
+    return _config_cache
+
+def _get_config():
+    cache = _config_cache
+    signature = _config_signature()
+    if cache is not None and cache[0] == signature:
+        return cache
+    with lock:
+        # another thread may have refreshed it while we were waiting
+        cache = _config_cache
+        signature = _config_signature()
+        if cache is not None and cache[0] == signature:
+            return cache
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as file:
+            data = yaml.load(file)
+        return _store_cache(signature, data)
+
 def load_key(key):
     # Check if the key has a corresponding environment variable
     if key in ENV_MAPPING:
@@ -36,18 +85,19 @@ def load_key(key):
         if env_val and env_val.strip():
             return env_val
 
-    with lock:
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as file:
-            data = yaml.load(file)
+    # containers come back as fresh copies, scalars are immutable and shared
+    _, data, index = _get_config()
+    if key in index:
+        return _to_plain(index[key])
 
-    keys = key.split('.')
+    # walk the tree only to report which part of the key is missing
     value = data
-    for k in keys:
+    for k in key.split('.'):
         if isinstance(value, dict) and k in value:
             value = value[k]
         else:
             raise KeyError(f"Key '{k}' not found in configuration")
-    return value
+    return _to_plain(value)
 
 def update_key(key, new_value):
     with lock:
@@ -66,6 +116,8 @@ def update_key(key, new_value):
             current[keys[-1]] = new_value
             with open(CONFIG_PATH, 'w', encoding='utf-8') as file:
                 yaml.dump(data, file)
+            # swap in the freshly written config in one step
+            _store_cache(_config_signature(), data)
             return True
         else:
             raise KeyError(f"Key '{keys[-1]}' not found in configuration")
@@ -0,0 +1,183 @@
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+from rich import print as rprint
+
+# ------------
+# priority lanes, lower value is served first
+# ------------
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# ------------
+# cheap token estimate
+# ------------
+
+def estimate_tokens(text):
+    """Rough token count: ~4 ascii chars per token, 1 token per CJK/other wide char"""
+    text = str(text)
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+_TOKEN_COUNTERS = {}
+
+def get_token_counter(encoding_name=None):
+    """`len(encode(text))` with a tiktoken encoding if available, otherwise `estimate_tokens`"""
+    if not encoding_name:
+        return estimate_tokens
+    if encoding_name not in _TOKEN_COUNTERS:
+        try:
+            import tiktoken
+            encoding = tiktoken.get_encoding(encoding_name)
+            _TOKEN_COUNTERS[encoding_name] = lambda text: len(encoding.encode(str(text), disallowed_special=()))
+        except Exception as e:
+            # tiktoken is optional and may need to download the encoding
+            rprint(f"[yellow]⚠️ Tokenizer `{encoding_name}` unavailable ({e}), using the token estimate[/yellow]")
+            _TOKEN_COUNTERS[encoding_name] = estimate_tokens
+    return _TOKEN_COUNTERS[encoding_name]
+
+# ------------
+# token bucket
+# ------------
+
+class TokenBucket:
+    """Refills `rate_per_min` units per minute, `rate_per_min <= 0` means unlimited"""
+    def __init__(self, rate_per_min):
+        self.capacity = float(rate_per_min)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        if self.capacity <= 0:
+            return 0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0 if self.level >= amount else (amount - self.level) * 60 / self.capacity
+
+    def consume(self, amount, now):
+        if self.capacity <= 0:
+            return
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def refund(self, amount, now):
+        if self.capacity <= 0:
+            return
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+# ------------
+# global scheduler
+# ------------
+
+class LLMScheduler:
+    """Shared rpm/tpm limiter with priority lanes and 429-aware adaptive concurrency (AIMD)"""
+    def __init__(self, max_concurrency, rpm=0, tpm=0):
+        self.max_concurrency = max(int(max_concurrency), 1)
+        self.limit = self.max_concurrency
+        self.in_flight = 0
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0
+        self.success_streak = 0
+        self.waiters = []
+        self.counter = itertools.count()
+        self.cond = None
+
+    def _wait_time(self, entry, tokens):
+        # None means wait for another request to finish, a number is a refill wait in seconds
+        if self.waiters[0] != entry or self.in_flight >= self.limit:
+            return None
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        return max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+
+    async def acquire(self, tokens, priority=PRIORITY_NORMAL):
+        if self.cond is None:
+            self.cond = asyncio.Condition()
+        entry = (priority, next(self.counter))
+        async with self.cond:
+            heapq.heappush(self.waiters, entry)
+            try:
+                while True:
+                    wait = self._wait_time(entry, tokens)
+                    if wait == 0:
+                        break
+                    try:
+                        await asyncio.wait_for(self.cond.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                now = time.monotonic()
+                self.requests.consume(1, now)
+                self.tokens.consume(tokens, now)
+                self.in_flight += 1
+            finally:
+                self.waiters.remove(entry)
+                heapq.heapify(self.waiters)
+                self.cond.notify_all()
+
+    async def release(self, used_tokens=0, rate_limited=False, retry_after=None):
+        async with self.cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            # `used_tokens` is the difference to the estimate taken in `acquire`
+            if used_tokens > 0:
+                self.tokens.consume(used_tokens, now)
+            elif used_tokens < 0:
+                self.tokens.refund(-used_tokens, now)
+            if rate_limited:
+                self.limit = max(1, self.limit // 2)
+                self.success_streak = 0
+                self.paused_until = max(self.paused_until, now + (retry_after or 5))
+                rprint(f"[yellow]⏳ Rate limited by provider, concurrency lowered to {self.limit}, pausing {retry_after or 5:.1f}s[/yellow]")
+            else:
+                self.success_streak += 1
+                if self.limit < self.max_concurrency and self.success_streak >= self.limit:
+                    self.limit += 1
+                    self.success_streak = 0
+            self.cond.notify_all()
+
+# ------------
+# background event loop shared by all threads
+# ------------
+
+_LOOP = None
+_LOOP_LOCK = threading.Lock()
+
+def get_engine_loop():
+    global _LOOP
+    if _LOOP is None:
+        with _LOOP_LOCK:
+            if _LOOP is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-engine", daemon=True).start()
+                _LOOP = loop
+    return _LOOP
+
+def run_in_engine(coro):
+    """Run a coroutine on the engine loop and block the calling thread until it finishes"""
+    loop = get_engine_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_in_engine would block the engine loop it waits on, use `await await_in_engine(...)` there")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+async def await_in_engine(coro):
+    """Await a coroutine on the engine loop from any other event loop"""
+    loop = get_engine_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
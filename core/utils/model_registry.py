@@ -0,0 +1,70 @@
+import gc
+from threading import Lock
+from collections import OrderedDict
+from rich import print as rprint
+
+# ------------
+# load-once registry for heavy local models (whisper, diarization)
+# ------------
+
+def available_memory_mb():
+    """Free system memory in MB, None if psutil is not installed"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.virtual_memory().available / 1024 / 1024
+
+class ModelRegistry:
+    """Lazily loads each registered model once per process, least recently used models are unloaded under memory pressure"""
+    def __init__(self, min_free_mb=0):
+        self.min_free_mb = min_free_mb
+        self.lock = Lock()
+        self.loaders = {}
+        self.models = OrderedDict()
+
+    def register(self, name, loader, unloader=None):
+        """`loader()` builds the model, `unloader(model)` releases anything it holds outside Python (caches, device memory)"""
+        self.loaders[name] = (loader, unloader)
+
+    def get(self, name):
+        with self.lock:
+            if name in self.models:
+                self.models.move_to_end(name)
+                return self.models[name]
+            self._make_room(keep=name)
+            loader, _ = self.loaders[name]
+            model = self.models[name] = loader()
+            return model
+
+    def warmup(self, *names):
+        """Load models ahead of the first request, e.g. before the segment loop"""
+        for name in names:
+            self.get(name)
+
+    def evict(self, name):
+        with self.lock:
+            self._evict(name)
+
+    def _evict(self, name):
+        model = self.models.pop(name, None)
+        if model is None:
+            return
+        _, unloader = self.loaders[name]
+        if unloader:
+            unloader(model)
+        del model
+        gc.collect()
+        rprint(f"[yellow]♻️ Unloaded model `{name}` to free memory[/yellow]")
+
+    def _make_room(self, keep):
+        if not self.min_free_mb:
+            return
+        while self.models:
+            free_mb = available_memory_mb()
+            if free_mb is None or free_mb >= self.min_free_mb:
+                return
+            oldest = next((n for n in self.models if n != keep), None)
+            if oldest is None:
+                return
+            self._evict(oldest)
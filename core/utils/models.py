@@ -1,16 +1,23 @@
+import os
+import ast
+import numpy as np
+import pandas as pd
+
 # ------------------------------------------
 # 定义中间产出文件
 # ------------------------------------------
 
-_2_CLEANED_CHUNKS = "output/log/cleaned_chunks.xlsx"
+_2_CLEANED_CHUNKS = "output/log/cleaned_chunks.parquet"
+_2_WORD_INDEX_DIR = "output/log/word_index"
 _3_1_SPLIT_BY_NLP = "output/log/split_by_nlp.txt"
 _3_2_SPLIT_BY_MEANING = "output/log/split_by_meaning.txt"
 _4_1_TERMINOLOGY = "output/log/terminology.json"
-_4_2_TRANSLATION = "output/log/translation_results.xlsx"
-_5_SPLIT_SUB = "output/log/translation_results_for_subtitles.xlsx"
-_5_REMERGED = "output/log/translation_results_remerged.xlsx"
+_4_2_TRANSLATION = "output/log/translation_results.parquet"
+_5_SPLIT_SUB = "output/log/translation_results_for_subtitles.parquet"
+_5_REMERGED = "output/log/translation_results_remerged.parquet"
 
-_8_1_AUDIO_TASK = "output/audio/tts_tasks.xlsx"
+_8_1_AUDIO_TASK = "output/audio/tts_tasks.parquet"
+AUDIO_TASK_LIST_COLUMNS = ("lines", "new_sub_times")
 
 
 # ------------------------------------------
@@ -25,12 +32,74 @@ _AUDIO_REFERS_DIR = "output/audio/refers"
 _AUDIO_SEGS_DIR = "output/audio/segs"
 _AUDIO_TMP_DIR = "output/audio/tmp"
 
+# ------------------------------------------
+# 读写中间表格
+# ------------------------------------------
+
+EXCEL_EXT = ".xlsx"
+
+def _excel_export_path(path):
+    return os.path.splitext(path)[0] + EXCEL_EXT
+
+def artifact_source(path):
+    """The file `load_artifact` will actually read: a newer hand-edited Excel export wins"""
+    excel_path = _excel_export_path(path)
+    if path != excel_path and os.path.exists(excel_path) and \
+            (not os.path.exists(path) or os.path.getmtime(excel_path) > os.path.getmtime(path)):
+        return excel_path
+    return path
+
+def save_artifact(df, path):
+    """Write an intermediate table, the format follows the file extension (parquet / feather / xlsx)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    ext = os.path.splitext(path)[1]
+    if ext == ".parquet":
+        df.to_parquet(path, index=False)
+    elif ext == ".feather":
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_excel(path, index=False)
+
+    from core.utils.config_utils import load_key
+    if ext != EXCEL_EXT and load_key("export_excel"):
+        excel_path = _excel_export_path(path)
+        df.to_excel(excel_path, index=False)
+        # same mtime as the export, so only an export edited afterwards is newer than the artifact
+        os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(excel_path).st_mtime_ns))
+
+def _array_to_list(value):
+    if isinstance(value, np.ndarray):
+        return [_array_to_list(v) for v in value]
+    return value.item() if isinstance(value, np.generic) else value
+
+def _to_list(value):
+    # parquet gives (nested) numpy arrays, an edited Excel export gives the repr string
+    if isinstance(value, str):
+        return ast.literal_eval(value)
+    return _array_to_list(value)
+
+def load_artifact(path, list_columns=()):
+    """Read an intermediate table, cells of `list_columns` come back as plain python lists"""
+    source = artifact_source(path)
+    ext = os.path.splitext(source)[1]
+    if ext == ".parquet":
+        df = pd.read_parquet(source)
+    elif ext == ".feather":
+        df = pd.read_feather(source)
+    else:
+        df = pd.read_excel(source)
+    for col in list_columns:
+        if col in df.columns:
+            df[col] = df[col].apply(_to_list).astype(object)
+    return df
+
 # ------------------------------------------
 # 导出
 # ------------------------------------------
 
 __all__ = [
     "_2_CLEANED_CHUNKS",
+    "_2_WORD_INDEX_DIR",
     "_3_1_SPLIT_BY_NLP",
     "_3_2_SPLIT_BY_MEANING",
     "_4_1_TERMINOLOGY",
@@ -38,6 +107,7 @@ __all__ = [
     "_5_SPLIT_SUB",
     "_5_REMERGED",
     "_8_1_AUDIO_TASK",
+    "AUDIO_TASK_LIST_COLUMNS",
     "_OUTPUT_DIR",
     "_AUDIO_DIR",
     "_RAW_AUDIO_FILE",
@@ -45,5 +115,8 @@ __all__ = [
     "_BACKGROUND_AUDIO_FILE",
     "_AUDIO_REFERS_DIR",
     "_AUDIO_SEGS_DIR",
-    "_AUDIO_TMP_DIR"
+    "_AUDIO_TMP_DIR",
+    "save_artifact",
+    "load_artifact",
+    "artifact_source"
 ]
@@ -0,0 +1,93 @@
+import os
+import subprocess
+from threading import Lock
+import numpy as np
+from rich import print as rprint
+
+# ------------
+# canonical 16 kHz mono int16 pcm, decoded once per audio file
+# ------------
+
+SAMPLE_RATE = 16000
+PCM_DTYPE = np.dtype('<i2')
+
+LOCK = Lock()
+_PCM_CACHE = {}
+
+def pcm_path(audio_file):
+    """`output/audio/raw.mp3` -> `output/audio/raw.16k.pcm`"""
+    return os.path.splitext(audio_file)[0] + '.16k.pcm'
+
+def decode_to_pcm(audio_file):
+    """Decode `audio_file` with FFmpeg into its raw pcm artifact, skipped if the artifact is newer than the source"""
+    pcm_file = pcm_path(audio_file)
+    if os.path.exists(pcm_file) and os.path.getmtime(pcm_file) >= os.path.getmtime(audio_file):
+        return pcm_file
+    rprint(f"[blue]🎵 Decoding <{audio_file}> to 16 kHz pcm ......[/blue]")
+    tmp_file = pcm_file + '.tmp'
+    subprocess.run([
+        'ffmpeg', '-y', '-i', audio_file, '-vn',
+        '-f', 's16le', '-acodec', 'pcm_s16le',
+        '-ar', str(SAMPLE_RATE), '-ac', '1', tmp_file
+    ], check=True, stderr=subprocess.PIPE)
+    # Windows refuses to replace a file that is still mapped, let go of our map first
+    release_pcm(pcm_file)
+    os.replace(tmp_file, pcm_file)
+    return pcm_file
+
+def release_pcm(pcm_file):
+    """Drop the cached memmap of `pcm_file`, the file is unmapped once no caller holds a view of it"""
+    with LOCK:
+        cached = _PCM_CACHE.pop(pcm_file, None)
+    # no explicit `_mmap.close()`, views handed out by `read_pcm` would point at unmapped memory
+    del cached
+
+def load_pcm(audio_file):
+    """Memory-mapped int16 samples of `audio_file`, decoding it first if needed"""
+    pcm_file = decode_to_pcm(audio_file)
+    stat = os.stat(pcm_file)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with LOCK:
+        cached = _PCM_CACHE.get(pcm_file)
+        if cached is None or cached[0] != signature:
+            samples = np.memmap(pcm_file, dtype=PCM_DTYPE, mode='r') if stat.st_size else np.zeros(0, dtype=PCM_DTYPE)
+            cached = _PCM_CACHE[pcm_file] = (signature, samples)
+    return cached[1]
+
+def pcm_duration(audio_file):
+    return len(load_pcm(audio_file)) / SAMPLE_RATE
+
+def to_sample(seconds):
+    return max(int(round(seconds * SAMPLE_RATE)), 0)
+
+def read_pcm(audio_file, start=0.0, end=None, dtype=np.float32):
+    """Samples between `start` and `end` seconds, a zero-copy int16 view or a float32 copy in [-1, 1)"""
+    samples = load_pcm(audio_file)
+    segment = samples[to_sample(start):None if end is None else to_sample(end)]
+    if np.dtype(dtype) == PCM_DTYPE:
+        return segment
+    return segment.astype(dtype) / 32768.0
+
+# ------------
+# silence search on a window of samples
+# ------------
+
+def find_silences(audio_file, start, end, min_silence_len=0.5, silence_thresh=-30, hop=0.01):
+    """Silent regions (start, end) in seconds between `start` and `end`, like pydub's `detect_silence` with a `hop` seek step"""
+    samples = read_pcm(audio_file, start, end).astype(np.float64)
+    frame, step = to_sample(min_silence_len), max(to_sample(hop), 1)
+    if frame == 0 or len(samples) < frame:
+        return []
+    # mean energy of every `frame` long window from a running sum, only this window is ever in memory
+    energy = np.concatenate(([0.0], np.cumsum(samples * samples)))
+    window_starts = np.arange(0, len(samples) - frame + 1, step)
+    mean_energy = (energy[window_starts + frame] - energy[window_starts]) / frame
+    silent = window_starts[mean_energy < (10 ** (silence_thresh / 20)) ** 2]
+    if len(silent) == 0:
+        return []
+    # consecutive silent windows form one region
+    breaks = np.flatnonzero(np.diff(silent) > step)
+    firsts = np.concatenate(([silent[0]], silent[breaks + 1]))
+    lasts = np.concatenate((silent[breaks], [silent[-1]]))
+    offset = to_sample(start)
+    return [((offset + s) / SAMPLE_RATE, (offset + e + frame) / SAMPLE_RATE) for s, e in zip(firsts, lasts)]
@@ -0,0 +1,127 @@
+import os
+import json
+import zlib
+from threading import Lock
+from difflib import SequenceMatcher
+import numpy as np
+from core.utils.config_utils import load_key
+
+# ------------
+# minhash signatures for fuzzy lookup
+# ------------
+
+NUM_PERM = 60
+BANDS = 20 # 20 bands x 3 rows, pairs above ~0.5 jaccard (about 0.85 similarity) almost always share a bucket
+ROWS = NUM_PERM // BANDS
+SHINGLE = 3
+_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+
+def normalize(text):
+    return ' '.join(str(text).lower().split())
+
+def minhash(text):
+    """MinHash signature over character shingles, works the same for spaced and CJK text"""
+    shingles = {text[i:i + SHINGLE] for i in range(max(len(text) - SHINGLE + 1, 1))}
+    hashes = np.array([zlib.crc32(s.encode('utf-8')) for s in shingles], dtype=np.uint64)
+    # uint64 wraps around, which is fine for a hash family
+    return ((hashes[:, None] * _PERM_A + _PERM_B) % _PRIME).min(axis=0)
+
+def _bands(signature):
+    return [(b, signature[b * ROWS:(b + 1) * ROWS].tobytes()) for b in range(BANDS)]
+
+# ------------
+# persistent memory of one target language and model
+# ------------
+
+class TranslationMemory:
+    """Append-only jsonl of source line -> translation, shared by every video translated into the same language with the same model"""
+    def __init__(self, folder, target_language, model, fuzzy_threshold=0.85, min_fuzzy_len=10):
+        self.folder = folder
+        self.key = [target_language, model]
+        self.fuzzy_threshold = fuzzy_threshold
+        self.min_fuzzy_len = min_fuzzy_len
+        self.file = os.path.join(folder, 'memory.jsonl')
+        self.lock = Lock()
+        self.exact = {}
+        self.buckets = None # built on first fuzzy lookup
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.file):
+            return
+        with open(self.file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    continue # half-written line from an interrupted run
+                if [item.get("lang"), item.get("model")] == self.key:
+                    self.exact[normalize(item["src"])] = item["tgt"]
+
+    def _add_to_buckets(self, src):
+        if len(src) < self.min_fuzzy_len:
+            return
+        for band in _bands(minhash(src)):
+            self.buckets.setdefault(band, []).append(src)
+
+    def _build_buckets(self):
+        self.buckets = {}
+        for src in self.exact:
+            self._add_to_buckets(src)
+
+    def lookup(self, text):
+        """Return the stored translation of an identical line or None"""
+        return self.exact.get(normalize(text))
+
+    def lookup_fuzzy(self, text):
+        """Return (source, translation, similarity) of the most similar stored line above the threshold, or None"""
+        src = normalize(text)
+        if len(src) < self.min_fuzzy_len:
+            return None
+        with self.lock:
+            if self.buckets is None:
+                self._build_buckets()
+            candidates = {c for band in _bands(minhash(src)) for c in self.buckets.get(band, ())}
+        best = None
+        for candidate in candidates:
+            ratio = SequenceMatcher(None, src, candidate, autojunk=False).ratio()
+            if ratio >= self.fuzzy_threshold and (best is None or ratio > best[2]):
+                best = (candidate, self.exact[candidate], ratio)
+        return best
+
+    def add(self, pairs):
+        """Store (source, translation) pairs, lines already in memory are skipped"""
+        with self.lock:
+            new_items = []
+            for src, tgt in pairs:
+                norm = normalize(src)
+                if not norm or not str(tgt).strip() or norm in self.exact:
+                    continue
+                self.exact[norm] = tgt
+                if self.buckets is not None:
+                    self._add_to_buckets(norm)
+                new_items.append({"lang": self.key[0], "model": self.key[1], "src": src, "tgt": tgt})
+            if new_items:
+                os.makedirs(self.folder, exist_ok=True)
+                with open(self.file, 'a', encoding='utf-8') as f:
+                    for item in new_items:
+                        f.write(json.dumps(item, ensure_ascii=False) + '\n')
+
+_MEMORIES = {}
+LOCK = Lock()
+
+def get_translation_memory():
+    """The memory for the configured target language and model, or None if `translation_memory.enabled` is off"""
+    if not load_key("translation_memory.enabled"):
+        return None
+    memory_key = (load_key("translation_memory.path"), load_key("target_language"), load_key("api.model"), float(load_key("translation_memory.fuzzy_threshold")))
+    memory = _MEMORIES.get(memory_key)
+    if memory is None:
+        with LOCK:
+            memory = _MEMORIES.get(memory_key)
+            if memory is None:
+                memory = _MEMORIES[memory_key] = TranslationMemory(*memory_key)
+    return memory
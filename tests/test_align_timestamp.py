@@ -0,0 +1,77 @@
+import os
+import sys
+import shutil
+import tempfile
+import pandas as pd
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core._6_gen_sub as gen_sub
+from core._6_gen_sub import get_sentence_timestamps
+
+WORDS = ["Hello", "world,", "it's", "a", "test.", "-", "New", "York", "is", "big!"]
+
+def _df_words():
+    return pd.DataFrame({
+        'text': WORDS,
+        'start': [float(i) for i in range(len(WORDS))],
+        'end': [i + 0.5 for i in range(len(WORDS))]
+    })
+
+def test_exact_alignment():
+    print("Testing exact sentence alignment...")
+    df_sentences = pd.DataFrame({'Source': ["Hello world, it's a test.", "- New York is big!"]})
+    stamps = get_sentence_timestamps(_df_words(), df_sentences)
+    assert stamps == [(0.0, 4.5), (6.0, 9.5)]
+    print("✅ exact sentence alignment test passed!")
+
+def test_fuzzy_alignment():
+    print("Testing fuzzy sentence alignment...")
+    # the LLM slightly rewrote both sentences
+    df_sentences = pd.DataFrame({'Source': ["Hello world, it is a test.", "New York is so big!"]})
+    stamps = get_sentence_timestamps(_df_words(), df_sentences)
+    assert stamps == [(0.0, 4.5), (6.0, 9.5)]
+    print("✅ fuzzy sentence alignment test passed!")
+
+def test_punctuation_only_transcript():
+    print("Testing punctuation-only transcript...")
+    df_words = pd.DataFrame({'text': ["...", "?!"], 'start': [1.0, 2.0], 'end': [1.5, 2.5]})
+    stamps = get_sentence_timestamps(df_words, pd.DataFrame({'Source': ["...", "?!"]}))
+    assert stamps == [(0.0, 0.0), (0.0, 0.0)]
+    empty = pd.DataFrame({'text': [], 'start': [], 'end': []})
+    assert get_sentence_timestamps(empty, pd.DataFrame({'Source': ["-"]})) == [(0.0, 0.0)]
+    print("✅ punctuation-only transcript test passed!")
+
+def test_word_index_rebuild_keeps_mapped_arrays():
+    print("Testing word index rebuild...")
+    tmp_dir = tempfile.mkdtemp()
+    patched = ('_2_WORD_INDEX_DIR', '_cleaned_chunks_signature', 'load_cleaned_chunks')
+    originals = {name: getattr(gen_sub, name) for name in patched}
+    chunks = {'signature': [1, 10], 'df': _df_words()}
+    gen_sub._2_WORD_INDEX_DIR = tmp_dir
+    gen_sub._cleaned_chunks_signature = lambda: chunks['signature']
+    gen_sub.load_cleaned_chunks = lambda: chunks['df']
+    try:
+        _, _, starts, _ = gen_sub.load_word_index()
+        assert len(starts) == len(WORDS)
+
+        # new chunks while the old arrays are still mapped, the rebuild writes new files
+        chunks['signature'], chunks['df'] = [2, 5], _df_words().iloc[:5]
+        _, _, new_starts, _ = gen_sub.load_word_index()
+        assert len(new_starts) == 5 and new_starts.filename != starts.filename
+        assert list(starts) == [float(i) for i in range(len(WORDS))]
+        assert sorted(f for f in os.listdir(tmp_dir) if f.endswith('.npy')) == ['ends.2-5.npy', 'offsets.2-5.npy', 'starts.2-5.npy']
+    finally:
+        for name, value in originals.items():
+            setattr(gen_sub, name, value)
+        gen_sub._WORD_INDEX_CACHE = None
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print("✅ word index rebuild test passed!")
+
+if __name__ == "__main__":
+    test_exact_alignment()
+    test_fuzzy_alignment()
+    test_punctuation_only_transcript()
+    test_word_index_rebuild_keeps_mapped_arrays()
+    print("\n🎉 All tests passed!")
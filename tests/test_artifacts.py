@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import pandas as pd
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core.utils.config_utils as config_utils
+from core.utils.models import save_artifact, load_artifact, artifact_source, AUDIO_TASK_LIST_COLUMNS
+
+def _audio_tasks():
+    return pd.DataFrame({
+        'number': [1, 2],
+        'text': ['你好', '世界'],
+        'lines': [['你好'], ['世', '界']],
+        'new_sub_times': [[[0.0, 1.5]], [[1.5, 2.0], [2.0, 3.25]]],
+    })
+
+def test_list_columns_round_trip():
+    print("Testing parquet list columns...")
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, 'tts_tasks.parquet')
+        save_artifact(_audio_tasks(), path)
+        df = load_artifact(path, list_columns=AUDIO_TASK_LIST_COLUMNS)
+        assert df['lines'].tolist() == [['你好'], ['世', '界']]
+        assert df['new_sub_times'].tolist() == [[[0.0, 1.5]], [[1.5, 2.0], [2.0, 3.25]]]
+        assert df['new_sub_times'][1][1][1] == 3.25
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print("✅ parquet list columns test passed!")
+
+def test_edited_excel_export_wins():
+    print("Testing Excel export precedence...")
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp_dir, 'tts_tasks.parquet')
+        save_artifact(_audio_tasks(), path)
+        assert artifact_source(path) == path
+
+        time.sleep(0.01)
+        edited = _audio_tasks()
+        edited.at[0, 'lines'] = ['您好']
+        edited.to_excel(os.path.join(tmp_dir, 'tts_tasks.xlsx'), index=False)
+        assert artifact_source(path).endswith('.xlsx')
+        df = load_artifact(path, list_columns=AUDIO_TASK_LIST_COLUMNS)
+        assert df['lines'].tolist() == [['您好'], ['世', '界']]
+        assert df['new_sub_times'][0] == [[0.0, 1.5]]
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print("✅ Excel export precedence test passed!")
+
+def test_fresh_excel_export_does_not_win():
+    print("Testing Excel export on save...")
+    tmp_dir = tempfile.mkdtemp()
+    original_load_key = config_utils.load_key
+    config_utils.load_key = lambda key: key == "export_excel" or original_load_key(key)
+    try:
+        path = os.path.join(tmp_dir, 'tts_tasks.parquet')
+        save_artifact(_audio_tasks(), path)
+        assert os.path.exists(os.path.join(tmp_dir, 'tts_tasks.xlsx'))
+        assert artifact_source(path) == path
+        assert load_artifact(path, list_columns=AUDIO_TASK_LIST_COLUMNS)['lines'].tolist() == [['你好'], ['世', '界']]
+    finally:
+        config_utils.load_key = original_load_key
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print("✅ Excel export on save test passed!")
+
+if __name__ == "__main__":
+    test_list_columns_round_trip()
+    test_edited_excel_export_wins()
+    test_fresh_excel_export_does_not_win()
+    print("\n🎉 All tests passed!")
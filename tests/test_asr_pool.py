@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+import concurrent.futures
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core._2_asr as asr
+
+def test_pool_segment_len():
+    print("Testing pool segment sizing...")
+    # one segment per worker, clamped to 5-30 minutes
+    assert asr.pool_segment_len(3600, 4) == 900
+    assert asr.pool_segment_len(600, 4) == 300
+    assert asr.pool_segment_len(4 * 3600, 2) == 1800
+    print("✅ pool segment sizing test passed!")
+
+def test_pool_results_keep_segment_order():
+    print("Testing pool result order...")
+    loaded = []
+    def load_model(model_name, cpu_threads):
+        loaded.append(cpu_threads)
+    def fake_transcribe(raw_audio_file, vocal_audio_file, start, end):
+        # later segments finish first
+        time.sleep(0.05 * (3 - start / 100))
+        return {'segments': [{'start': start, 'end': end, 'text': f"segment {int(start)}"}]}
+
+    # threads stand in for worker processes, same executor api
+    original_pool, original_load_key = asr.ProcessPoolExecutor, asr.load_key
+    asr.ProcessPoolExecutor = concurrent.futures.ThreadPoolExecutor
+    asr.load_key = lambda key: "large-v3" if key == "whisper.model" else original_load_key(key)
+    try:
+        segments = [(0, 100), (100, 200), (200, 300)]
+        results = asr.transcribe_segments_in_pool(fake_transcribe, load_model, segments, "vocal.mp3", 3, 2)
+    finally:
+        asr.ProcessPoolExecutor, asr.load_key = original_pool, original_load_key
+
+    assert [r['segments'][0]['start'] for r in results] == [0, 100, 200]
+    # every worker loads the model with its share of the threads
+    assert loaded and set(loaded) == {2}
+    print("✅ pool result order test passed!")
+
+if __name__ == "__main__":
+    test_pool_segment_len()
+    test_pool_results_keep_segment_order()
+    print("\n🎉 All tests passed!")
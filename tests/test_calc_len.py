@@ -0,0 +1,31 @@
+import os
+import sys
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core._5_split_sub import calc_len, calc_lens
+
+def test_weights():
+    print("Testing subtitle length weights...")
+    assert calc_len("hello") == 5
+    assert calc_len("你好") == 3.5
+    assert calc_len("こんにちは") == 8.75
+    assert calc_len("안녕") == 3
+    assert calc_len("สวัสดี") == 6
+    assert calc_len("！？") == 3.5
+    assert calc_len("😀a") == 2
+    assert calc_len(None) == 4  # "None"
+    print("✅ subtitle length weights test passed!")
+
+def test_batch_matches_single():
+    print("Testing batch subtitle lengths...")
+    texts = ["hello", "你好 world", "", "안녕하세요！", 12.5, "😀你"]
+    assert calc_lens(texts).tolist() == [calc_len(text) for text in texts]
+    assert calc_lens([]).tolist() == []
+    print("✅ batch subtitle lengths test passed!")
+
+if __name__ == "__main__":
+    test_weights()
+    test_batch_matches_single()
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,77 @@
+import os
+import sys
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.utils import config_utils
+
+@contextmanager
+def temp_config():
+    original_path = config_utils.CONFIG_PATH
+    tmp_dir = tempfile.mkdtemp()
+    tmp_config = os.path.join(tmp_dir, 'config.yaml')
+    shutil.copy(os.path.join(os.path.dirname(__file__), '..', 'config.yaml'), tmp_config)
+    config_utils.CONFIG_PATH = tmp_config
+    config_utils._config_cache = None
+    try:
+        yield tmp_config
+    finally:
+        config_utils.CONFIG_PATH = original_path
+        config_utils._config_cache = None
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def test_load_key_uses_cache():
+    print("Testing load_key cache...")
+    with temp_config():
+        assert config_utils.load_key("subtitle.max_length") == 75
+        cache = config_utils._config_cache
+        config_utils.load_key("max_workers")
+        assert config_utils._config_cache is cache
+        try:
+            config_utils.load_key("subtitle.not_exist")
+            assert False, "expected KeyError"
+        except KeyError as e:
+            assert "not_exist" in str(e)
+    print("✅ load_key cache test passed!")
+
+def test_update_key_refreshes_cache():
+    print("Testing update_key invalidation...")
+    with temp_config():
+        assert config_utils.load_key("max_workers") == 4
+        config_utils.update_key("max_workers", 8)
+        assert config_utils.load_key("max_workers") == 8
+    print("✅ update_key invalidation test passed!")
+
+def test_external_edit_is_picked_up():
+    print("Testing external edit detection...")
+    with temp_config() as tmp_config:
+        assert config_utils.load_key("target_language") == '简体中文'
+        with open(tmp_config, 'r', encoding='utf-8') as f:
+            content = f.read()
+        with open(tmp_config, 'w', encoding='utf-8') as f:
+            f.write(content.replace("target_language: '简体中文'", "target_language: 'English'"))
+        assert config_utils.load_key("target_language") == 'English'
+    print("✅ external edit detection test passed!")
+
+def test_returned_containers_are_copies():
+    print("Testing load_key copies...")
+    with temp_config():
+        subtitle = config_utils.load_key("subtitle")
+        subtitle["max_length"] = 10
+        languages = config_utils.load_key("language_split_with_space")
+        languages.append("xx")
+        assert config_utils.load_key("subtitle")["max_length"] == 75
+        assert config_utils.load_key("subtitle.max_length") == 75
+        assert "xx" not in config_utils.load_key("language_split_with_space")
+    print("✅ load_key copies test passed!")
+
+if __name__ == "__main__":
+    test_load_key_uses_cache()
+    test_update_key_refreshes_cache()
+    test_external_edit_is_picked_up()
+    test_returned_containers_are_copies()
+    print("\n🎉 All tests passed!")
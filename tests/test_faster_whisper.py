@@ -0,0 +1,84 @@
+import os
+import sys
+import types
+from types import SimpleNamespace
+import numpy as np
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core.asr_backend.faster_whisper_local as faster_whisper_local
+
+CONFIG = {
+    "whisper.model": "mlx-community/whisper-large-v3-turbo",
+    "whisper.language": "en",
+    "whisper.compute_type": "int8",
+    "whisper.cpu_threads_per_worker": 0,
+}
+
+class FakeWhisperModel:
+    """Stands in for faster_whisper.WhisperModel, segments are relative to the audio it gets"""
+    instances = []
+
+    def __init__(self, size, device, compute_type, cpu_threads, download_root):
+        self.size, self.cpu_threads = size, cpu_threads
+        FakeWhisperModel.instances.append(self)
+
+    def transcribe(self, audio, language=None, word_timestamps=False, vad_filter=False):
+        word = SimpleNamespace(word=" hello", start=0.5, end=1.0)
+        segments = iter([SimpleNamespace(start=0.5, end=1.5, text=" hello there", words=[word])])
+        return segments, SimpleNamespace(language=language or "en")
+
+def _patch(config):
+    originals = (faster_whisper_local.load_key, faster_whisper_local.read_pcm, faster_whisper_local._MODEL, sys.modules.get("faster_whisper"))
+    faster_whisper_local.load_key = config.get
+    faster_whisper_local.read_pcm = lambda audio_file, start, end: np.zeros(int((end - start) * 16000), dtype=np.float32)
+    faster_whisper_local._MODEL = None
+    sys.modules["faster_whisper"] = types.SimpleNamespace(WhisperModel=FakeWhisperModel)
+    return originals
+
+def _restore(originals):
+    faster_whisper_local.load_key, faster_whisper_local.read_pcm, faster_whisper_local._MODEL, module = originals
+    if module is None:
+        sys.modules.pop("faster_whisper", None)
+    else:
+        sys.modules["faster_whisper"] = module
+
+def test_threads_per_worker():
+    print("Testing CPU thread split...")
+    originals = _patch(dict(CONFIG))
+    original_cpu_count = faster_whisper_local.os.cpu_count
+    faster_whisper_local.os.cpu_count = lambda: 8
+    try:
+        assert faster_whisper_local.threads_per_worker(1) == 8
+        assert faster_whisper_local.threads_per_worker(3) == 2
+        assert faster_whisper_local.threads_per_worker(16) == 1
+        faster_whisper_local.load_key = dict(CONFIG, **{"whisper.cpu_threads_per_worker": 3}).get
+        assert faster_whisper_local.threads_per_worker(4) == 3
+    finally:
+        faster_whisper_local.os.cpu_count = original_cpu_count
+        _restore(originals)
+    print("✅ CPU thread split test passed!")
+
+def test_transcribe_shifts_to_global_timeline():
+    print("Testing faster-whisper segment transcription...")
+    FakeWhisperModel.instances.clear()
+    originals = _patch(dict(CONFIG))
+    try:
+        first = faster_whisper_local.transcribe_audio("raw.mp3", "raw.mp3", 60.0, 90.0)
+        second = faster_whisper_local.transcribe_audio("raw.mp3", "raw.mp3", 90.0, 120.0)
+    finally:
+        _restore(originals)
+
+    # one model per process, the mlx model name is mapped to the faster-whisper size
+    assert len(FakeWhisperModel.instances) == 1 and FakeWhisperModel.instances[0].size == "large-v3-turbo"
+    assert first == {'language': 'en', 'segments': [{'start': 60.5, 'end': 61.5, 'text': ' hello there', 'words': [{'word': ' hello', 'start': 60.5, 'end': 61.0}]}]}
+    assert second['segments'][0]['start'] == 90.5
+    # no diarization in this runtime
+    assert 'speaker_id' not in first['segments'][0]
+    print("✅ faster-whisper segment transcription test passed!")
+
+if __name__ == "__main__":
+    test_threads_per_worker()
+    test_transcribe_shifts_to_global_timeline()
+    print("\n🎉 All tests passed!")
@@ -7,7 +7,8 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.asr_backend.audio_preprocess import save_results
-from core._4_2_translate import split_chunks_by_chars
+from core._4_2_translate import split_chunks_by_chars, split_chunks_by_tokens, iter_chunks, CHAR_CHUNK_SIZE
+from core.utils.llm_scheduler import estimate_tokens
 from core.translate_lines import translate_lines
 
 def test_audio_preprocess_cleaning():
@@ -55,6 +56,34 @@ def test_chunking_logic():
     assert all(c.strip() for c in chunks)
     print("✅ chunking logic test passed!")
 
+def test_token_chunking():
+    print("Testing token budget chunking...")
+    sentences = ["This is a fairly ordinary English sentence."] * 6 + ["这是一个相当普通的中文句子。"] * 6
+    chunks = list(iter_chunks(sentences, 40, 10, count=estimate_tokens))
+    assert '\n'.join(chunks).split('\n') == sentences
+    assert all(sum(estimate_tokens(s + '\n') for s in c.split('\n')) <= 40 for c in chunks)
+    # the same budget holds more latin sentences than CJK ones
+    assert len(chunks[0].split('\n')) > len(chunks[-1].split('\n'))
+    print("✅ token budget chunking test passed!")
+
+def test_zero_token_budget_chunks_by_chars():
+    print("Testing character chunking fallback...")
+    test_file = 'output/log/test_split_by_meaning.txt'
+    with open(test_file, 'w') as f:
+        f.write('\n'.join(["x" * 250] * 5))
+
+    import core._4_2_translate
+    core._4_2_translate._3_2_SPLIT_BY_MEANING = test_file
+    original_load_key = core._4_2_translate.load_key
+    core._4_2_translate.load_key = lambda key: 0 if key == "translate_chunk.max_tokens" else original_load_key(key)
+    try:
+        chunks = split_chunks_by_tokens()
+    finally:
+        core._4_2_translate.load_key = original_load_key
+    assert chunks == split_chunks_by_chars(chunk_size=CHAR_CHUNK_SIZE, max_i=original_load_key("translate_chunk.max_lines"))
+    assert [len(c.split('\n')) for c in chunks] == [2, 2, 1]
+    print("✅ character chunking fallback test passed!")
+
 def test_translate_lines_robustness():
     print("Testing translate_lines robustness...")
     res1, res2 = translate_lines("", None, None, None, None)
@@ -69,6 +98,8 @@ if __name__ == "__main__":
     try:
         test_audio_preprocess_cleaning()
         test_chunking_logic()
+        test_token_chunking()
+        test_zero_token_budget_chunks_by_chars()
         test_translate_lines_robustness()
         print("\n🎉 All tests passed!")
     except Exception as e:
@@ -0,0 +1,54 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import importlib
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# `core.utils.ask_gpt` is shadowed by the re-exported function, import the module explicitly
+ask_gpt_module = importlib.import_module('core.utils.ask_gpt')
+ORIGINAL_LOG_FOLDER = ask_gpt_module.GPT_LOG_FOLDER
+
+def _reset_cache_folder():
+    tmp_dir = tempfile.mkdtemp()
+    ask_gpt_module.GPT_LOG_FOLDER = tmp_dir
+    ask_gpt_module._STORES.clear()
+    return tmp_dir
+
+def _restore_cache_folder(tmp_dir):
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    ask_gpt_module.GPT_LOG_FOLDER = ORIGINAL_LOG_FOLDER
+    ask_gpt_module._STORES.clear()
+
+def test_save_and_load_cache():
+    print("Testing gpt cache round trip...")
+    tmp_dir = _reset_cache_folder()
+    ask_gpt_module._save_cache("model-a", "prompt", "{}", "json", {"ok": 1}, log_title="unit")
+    assert ask_gpt_module._load_cache("model-a", "prompt", "json", "unit") == {"ok": 1}
+    assert ask_gpt_module._load_cache("model-b", "prompt", "json", "unit") is False
+    assert ask_gpt_module._load_cache("model-a", "prompt", None, "unit") is False
+    # deleting the log drops the cached responses
+    os.remove(os.path.join(tmp_dir, "unit.jsonl"))
+    assert ask_gpt_module._load_cache("model-a", "prompt", "json", "unit") is False
+    _restore_cache_folder(tmp_dir)
+    print("✅ gpt cache round trip test passed!")
+
+def test_legacy_json_log_is_migrated():
+    print("Testing legacy gpt log migration...")
+    tmp_dir = _reset_cache_folder()
+    legacy = [{"model": "m", "prompt": "p", "resp_content": "x", "resp_type": "json", "resp": {"a": 1}, "message": None}]
+    with open(os.path.join(tmp_dir, "legacy.json"), 'w', encoding='utf-8') as f:
+        json.dump(legacy, f)
+    assert ask_gpt_module._load_cache("m", "p", "json", "legacy") == {"a": 1}
+    assert os.path.exists(os.path.join(tmp_dir, "legacy.jsonl"))
+    assert not os.path.exists(os.path.join(tmp_dir, "legacy.json"))
+    _restore_cache_folder(tmp_dir)
+    print("✅ legacy gpt log migration test passed!")
+
+if __name__ == "__main__":
+    test_save_and_load_cache()
+    test_legacy_json_log_is_migrated()
+    print("\n🎉 All tests passed!")
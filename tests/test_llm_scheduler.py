@@ -0,0 +1,126 @@
+import os
+import sys
+import time
+import asyncio
+import importlib
+from types import SimpleNamespace
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.utils.llm_scheduler import TokenBucket, LLMScheduler, PRIORITY_HIGH, PRIORITY_LOW, get_engine_loop, run_in_engine, await_in_engine
+
+# `core.utils.ask_gpt` is shadowed by the re-exported function, import the module explicitly
+ask_gpt_module = importlib.import_module('core.utils.ask_gpt')
+
+def test_token_bucket_refill():
+    print("Testing token bucket refill...")
+    # `now` is passed in, so the bucket runs on a fake clock
+    bucket = TokenBucket(60)
+    bucket.updated = 0.0
+    bucket.consume(60, 0.0)
+    assert bucket.wait_time(1, 0.0) == 1.0
+    assert bucket.wait_time(10, 5.0) == 5.0
+    assert bucket.wait_time(10, 10.0) == 0
+    # never refills above capacity, oversized requests wait for a full bucket only
+    assert bucket.wait_time(1000, 500.0) == 0 and bucket.level == 60
+    bucket.refund(30, 500.0)
+    assert bucket.level == 60
+    assert TokenBucket(0).wait_time(10 ** 9, 0.0) == 0
+    print("✅ token bucket refill test passed!")
+
+def test_acquire_serves_higher_priority_first():
+    print("Testing priority order...")
+    async def run():
+        scheduler = LLMScheduler(1)
+        await scheduler.acquire(1)
+        order = []
+        async def request(name, priority):
+            await scheduler.acquire(1, priority)
+            order.append(name)
+            await scheduler.release()
+        tasks = [asyncio.create_task(request("low", PRIORITY_LOW)), asyncio.create_task(request("high", PRIORITY_HIGH))]
+        await asyncio.sleep(0.01)
+        assert order == []
+        await scheduler.release()
+        await asyncio.gather(*tasks)
+        return order
+    assert asyncio.run(run()) == ["high", "low"]
+    print("✅ priority order test passed!")
+
+def test_rate_limit_halves_concurrency_and_recovers():
+    print("Testing adaptive concurrency...")
+    async def run():
+        scheduler = LLMScheduler(8)
+        await scheduler.acquire(1)
+        await scheduler.release(rate_limited=True, retry_after=0)
+        assert scheduler.limit == 4
+        # additive increase: one more slot after `limit` successes in a row
+        for _ in range(4):
+            await scheduler.acquire(1)
+            await scheduler.release()
+        assert scheduler.limit == 5
+        for _ in range(4):
+            await scheduler.acquire(1)
+            await scheduler.release()
+        assert scheduler.limit == 5
+        await scheduler.acquire(1)
+        await scheduler.release()
+        assert scheduler.limit == 6
+    asyncio.run(run())
+    print("✅ adaptive concurrency test passed!")
+
+def test_retry_after_pauses_requests():
+    print("Testing retry-after pause...")
+    async def run():
+        scheduler = LLMScheduler(4)
+        await scheduler.acquire(1)
+        await scheduler.release(rate_limited=True, retry_after=0.2)
+        started = time.monotonic()
+        await scheduler.acquire(1)
+        await scheduler.release()
+        return time.monotonic() - started
+    assert asyncio.run(run()) >= 0.19
+    print("✅ retry-after pause test passed!")
+
+def test_overestimate_is_refunded():
+    print("Testing token refund...")
+    class FakeCompletions:
+        async def create(self, **params):
+            return SimpleNamespace(usage=SimpleNamespace(total_tokens=21))
+    client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    scheduler = LLMScheduler(1, tpm=1000)
+    original_get_scheduler = ask_gpt_module._get_scheduler
+    ask_gpt_module._get_scheduler = lambda: scheduler
+    try:
+        # 400 ascii chars are estimated at 101 tokens, the reply used 21
+        params = {"messages": [{"role": "user", "content": "x" * 400}]}
+        asyncio.run(ask_gpt_module._create_completion(client, params, PRIORITY_HIGH))
+    finally:
+        ask_gpt_module._get_scheduler = original_get_scheduler
+    assert abs(scheduler.tokens.level - 979) < 1
+    print("✅ token refund test passed!")
+
+def test_run_in_engine_refuses_engine_loop():
+    print("Testing engine loop guard...")
+    async def nested():
+        try:
+            run_in_engine(asyncio.sleep(0))
+        except RuntimeError:
+            return "refused"
+        return "blocked"
+    # a timeout instead of a hang if the guard ever regresses into a deadlock
+    assert asyncio.run_coroutine_threadsafe(nested(), get_engine_loop()).result(timeout=5) == "refused"
+    # the async entry point works from the engine loop and from other loops
+    assert asyncio.run_coroutine_threadsafe(await_in_engine(asyncio.sleep(0, "ok")), get_engine_loop()).result() == "ok"
+    assert asyncio.run(await_in_engine(asyncio.sleep(0, "ok"))) == "ok"
+    print("✅ engine loop guard test passed!")
+
+if __name__ == "__main__":
+    test_token_bucket_refill()
+    test_acquire_serves_higher_priority_first()
+    test_rate_limit_halves_concurrency_and_recovers()
+    test_retry_after_pauses_requests()
+    test_overestimate_is_refunded()
+    test_run_in_engine_refuses_engine_loop()
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,50 @@
+import os
+import sys
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core.utils.model_registry as model_registry
+from core.utils.model_registry import ModelRegistry
+
+def test_models_load_once():
+    print("Testing model registry lazy load...")
+    loads = []
+    registry = ModelRegistry()
+    registry.register("whisper", lambda: loads.append("whisper") or object())
+    registry.warmup("whisper")
+    model = registry.get("whisper")
+    assert registry.get("whisper") is model
+    assert loads == ["whisper"]
+    print("✅ model registry lazy load test passed!")
+
+def test_least_recently_used_model_is_evicted():
+    print("Testing model registry eviction...")
+    free_mb = [5000]
+    unloaded = []
+    def unload(model):
+        unloaded.append(model)
+        free_mb[0] += 300
+
+    registry = ModelRegistry(min_free_mb=1000)
+    for name in ("whisper", "diarization", "vad"):
+        registry.register(name, lambda name=name: name, unload)
+
+    original = model_registry.available_memory_mb
+    model_registry.available_memory_mb = lambda: free_mb[0]
+    try:
+        registry.warmup("whisper", "diarization")
+        registry.get("whisper")
+        # under pressure the least recently used model goes first, then the next one until enough is free
+        free_mb[0] = 500
+        registry.get("vad")
+        assert unloaded == ["diarization", "whisper"]
+        assert list(registry.models) == ["vad"]
+    finally:
+        model_registry.available_memory_mb = original
+    print("✅ model registry eviction test passed!")
+
+if __name__ == "__main__":
+    test_models_load_once()
+    test_least_recently_used_model_is_evicted()
+    print("\n🎉 All tests passed!")
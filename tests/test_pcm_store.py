@@ -0,0 +1,94 @@
+import os
+import sys
+import shutil
+import tempfile
+import weakref
+import numpy as np
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core.utils.pcm_store as pcm_store
+from core.utils.pcm_store import pcm_path, read_pcm, pcm_duration, find_silences, SAMPLE_RATE
+
+def _write_pcm(tmp_dir, samples):
+    # a pcm artifact newer than the source is used as is, no FFmpeg needed
+    audio_file = os.path.join(tmp_dir, 'raw.mp3')
+    open(audio_file, 'wb').close()
+    samples.astype('<i2').tofile(pcm_path(audio_file))
+    os.utime(audio_file, (0, 0))
+    return audio_file
+
+def test_slices_are_sample_accurate():
+    print("Testing pcm store slicing...")
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        samples = (np.arange(3 * SAMPLE_RATE) % 20000 - 10000).astype('<i2')
+        audio_file = _write_pcm(tmp_dir, samples)
+
+        assert pcm_duration(audio_file) == 3.0
+        view = read_pcm(audio_file, 1.0, 1.5, dtype=np.int16)
+        assert isinstance(view, np.memmap) and len(view) == SAMPLE_RATE // 2
+        assert np.array_equal(view, samples[SAMPLE_RATE:SAMPLE_RATE * 3 // 2])
+        floats = read_pcm(audio_file, 2.5)
+        assert floats.dtype == np.float32 and len(floats) == SAMPLE_RATE // 2
+        assert np.allclose(floats, samples[SAMPLE_RATE * 5 // 2:] / 32768.0)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print("✅ pcm store slicing test passed!")
+
+def test_find_silences_in_window():
+    print("Testing silence search...")
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        rng = np.random.default_rng(0)
+        samples = rng.integers(-12000, 12000, 20 * SAMPLE_RATE)
+        samples[11 * SAMPLE_RATE:int(12.5 * SAMPLE_RATE)] //= 1000  # 1.5s of near silence
+        samples[15 * SAMPLE_RATE:int(15.2 * SAMPLE_RATE)] = 0  # too short to count
+        audio_file = _write_pcm(tmp_dir, samples)
+
+        regions = find_silences(audio_file, 8, 18)
+        assert len(regions) == 1
+        start, end = regions[0]
+        assert abs(start - 11) <= 0.01 and abs(end - 12.5) <= 0.01
+        # regions are reported on the global timeline and clipped to the window
+        assert find_silences(audio_file, 11.5, 13)[0][0] == 11.5
+        assert find_silences(audio_file, 0, 10) == []
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print("✅ silence search test passed!")
+
+def test_redecode_releases_old_map():
+    print("Testing pcm re-decode...")
+    tmp_dir = tempfile.mkdtemp()
+    original_run, original_replace = pcm_store.subprocess.run, os.replace
+    try:
+        audio_file = _write_pcm(tmp_dir, np.zeros(SAMPLE_RATE, dtype='<i2'))
+        old_map = weakref.ref(pcm_store.load_pcm(audio_file))
+        assert old_map() is not None
+
+        # a newer source is decoded again, the fake FFmpeg writes its output file
+        def fake_ffmpeg(cmd, **kwargs):
+            np.ones(2 * SAMPLE_RATE, dtype='<i2').tofile(cmd[-1])
+        mapped_at_replace = []
+        def recording_replace(src, dst):
+            mapped_at_replace.append(old_map() is not None)
+            original_replace(src, dst)
+        pcm_store.subprocess.run, os.replace = fake_ffmpeg, recording_replace
+        os.utime(audio_file, None)
+        os.utime(pcm_path(audio_file), (0, 0))
+
+        assert pcm_duration(audio_file) == 2.0
+        # the cache no longer kept the file mapped when it was replaced
+        assert mapped_at_replace == [False]
+        assert read_pcm(audio_file, 0, 0.1, dtype=np.int16).min() == 1
+    finally:
+        pcm_store.subprocess.run, os.replace = original_run, original_replace
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print("✅ pcm re-decode test passed!")
+
+if __name__ == "__main__":
+    test_slices_are_sample_accurate()
+    test_find_silences_in_window()
+    test_redecode_releases_old_map()
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,55 @@
+import os
+import sys
+import importlib
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.prompts import generate_shared_prompt, generate_context_prompt, get_prompt_faithfulness, get_prompt_expressiveness
+
+# `core.utils.ask_gpt` is shadowed by the re-exported function, import the module explicitly
+ask_gpt_module = importlib.import_module('core.utils.ask_gpt')
+
+SHARED_PROMPT = generate_shared_prompt("A talk about neural networks", '1. "GPU": "GPU", meaning: graphics card')
+
+def test_faithfulness_prefix_is_shared_across_chunks():
+    print("Testing faithfulness prompt prefix layout...")
+    prefix1, suffix1 = get_prompt_faithfulness("first line\nsecond line", SHARED_PROMPT, generate_context_prompt(None, ["third line"]))
+    prefix2, suffix2 = get_prompt_faithfulness("third line", SHARED_PROMPT, generate_context_prompt(["second line"], None))
+    assert prefix1 == prefix2 and suffix1 != suffix2
+    assert "third line" not in prefix1
+    print("✅ faithfulness prompt prefix layout test passed!")
+
+def test_expressiveness_prefix_is_shared_across_chunks():
+    print("Testing expressiveness prompt prefix layout...")
+    faith1 = {"1": {"origin": "first line", "direct": "第一行"}}
+    faith2 = {"1": {"origin": "third line", "direct": "第三行"}}
+    prefix1, suffix1 = get_prompt_expressiveness(faith1, "first line", SHARED_PROMPT, generate_context_prompt(None, ["third line"]))
+    prefix2, suffix2 = get_prompt_expressiveness(faith2, "third line", SHARED_PROMPT, generate_context_prompt(["first line"], None))
+    assert prefix1 == prefix2 and suffix1 != suffix2
+    # the chunk and its direct translation only appear after the shared prefix
+    assert "第一行" not in prefix1 and "第一行" in suffix1
+    print("✅ expressiveness prompt prefix layout test passed!")
+
+def test_build_messages_layout():
+    print("Testing prompt message layout...")
+    prefix, suffix = get_prompt_faithfulness("first line", SHARED_PROMPT, generate_context_prompt(None, None))
+    original_load_key = ask_gpt_module.load_key
+    try:
+        ask_gpt_module.load_key = lambda key: False
+        prompt, system, messages = ask_gpt_module._build_messages(suffix, prefix)
+        assert system is None and prompt.startswith(prefix) and prompt.endswith(suffix)
+        assert [m["role"] for m in messages] == ["user"]
+        ask_gpt_module.load_key = lambda key: True
+        prompt, system, messages = ask_gpt_module._build_messages(suffix, prefix)
+        assert (prompt, system) == (suffix, prefix)
+        assert [m["role"] for m in messages] == ["system", "user"]
+    finally:
+        ask_gpt_module.load_key = original_load_key
+    print("✅ prompt message layout test passed!")
+
+if __name__ == "__main__":
+    test_faithfulness_prefix_is_shared_across_chunks()
+    test_expressiveness_prefix_is_shared_across_chunks()
+    test_build_messages_layout()
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,117 @@
+import os
+import sys
+import spacy
+from spacy.language import Language
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core.spacy_utils.load_nlp_model as load_nlp_model
+from core.spacy_utils.load_nlp_model import pipe_docs
+from core.spacy_utils.split_by_comma import split_span_by_comma
+from core.spacy_utils.split_by_connector import split_span_by_connectors
+from core.spacy_utils.split_long_by_root import root_split_spans
+from core.spacy_utils.split_pipeline import split_doc
+
+PRONOUNS = {"i", "you", "he", "she", "we", "they"}
+VERBS = {"went", "said", "think", "saw", "knew", "stayed"}
+
+@Language.component("test_rule_tagger")
+def rule_tagger(doc):
+    # stands in for the trained tagger / parser, enough for the split rules
+    for token in doc:
+        word = token.text.lower()
+        if word in PRONOUNS:
+            token.pos_, token.dep_ = "PRON", "nsubj"
+        elif word in VERBS:
+            token.pos_, token.dep_ = "VERB", "ROOT"
+        elif token.is_punct:
+            token.pos_, token.dep_ = "PUNCT", "punct"
+        else:
+            token.pos_, token.dep_ = "X", "dep"
+    return doc
+
+def _make_nlp():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("test_rule_tagger")
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+def test_connector_split_reuses_parse():
+    print("Testing connector split on spans...")
+    nlp = _make_nlp()
+    text = "we went to the old market in town because they said the fruit there was fresh but we stayed at home all day long"
+    doc = pipe_docs(nlp, [text])[0]
+    pieces = split_span_by_connectors(doc)
+    assert [p.text for p in pieces] == [
+        "we went to the old market in town",
+        "because they said the fruit there was fresh",
+        "but we stayed at home all day long",
+    ]
+    assert all(p.doc is doc for p in pieces)
+    print("✅ connector split test passed!")
+
+def test_comma_split_stays_inside_span():
+    print("Testing comma split bounds...")
+    nlp = _make_nlp()
+    doc = nlp("on the long way home today, we saw the old bridge. then they went home")
+    first = list(doc.sents)[0]
+    pieces = split_span_by_comma(first)
+    assert [p.text for p in pieces] == ["on the long way home today", "we saw the old bridge."]
+    print("✅ comma split bounds test passed!")
+
+def test_root_split_spans_cover_sentence():
+    print("Testing long sentence split...")
+    nlp = _make_nlp()
+    doc = nlp(" ".join(["we went home and then they said so"] * 20))
+    spans = root_split_spans(doc)
+    assert len(spans) > 1
+    assert spans[0].start == 0 and spans[-1].end == len(doc)
+    assert all(a.end == b.start for a, b in zip(spans, spans[1:]))
+    print("✅ long sentence split test passed!")
+
+def test_split_doc_runs_all_rules_on_one_parse():
+    print("Testing in-memory split pipeline...")
+    nlp = _make_nlp()
+    doc = nlp("on the long way home today, we saw the old bridge. we went to the old market in town because they said the fruit there was fresh...")
+    spans = split_doc(doc)
+    assert [s.text.strip() for s in spans] == [
+        "on the long way home today",
+        "we saw the old bridge.",
+        "we went to the old market in town",
+        "because they said the fruit there was fresh...",
+    ]
+    assert all(s.doc is doc for s in spans)
+    print("✅ in-memory split pipeline test passed!")
+
+def test_pipe_docs_uses_worker_processes():
+    print("Testing multi-process parsing...")
+    nlp = _make_nlp()
+    calls = []
+    original_pipe, original_load_key = nlp.pipe, load_nlp_model.load_key
+    def recording_pipe(texts, **kwargs):
+        calls.append(kwargs)
+        return original_pipe(texts, **kwargs)
+    nlp.pipe = recording_pipe
+    load_nlp_model.load_key = lambda key: 2 if key == "spacy_n_process" else original_load_key(key)
+    try:
+        texts = [f"we went home on day {i}. they stayed." for i in range(5)]
+        docs = pipe_docs(nlp, texts)
+        # a handful of long segments is enough to fan out
+        assert calls[0]["n_process"] == 2 and calls[0]["batch_size"] == 3
+        assert [d.text for d in docs] == texts
+        assert [[t.pos_ for t in d] for d in docs] == [[t.pos_ for t in d] for d in original_pipe(texts)]
+        # never more workers than segments
+        pipe_docs(nlp, texts[:1])
+        assert calls[1]["n_process"] == 1
+    finally:
+        load_nlp_model.load_key = original_load_key
+    print("✅ multi-process parsing test passed!")
+
+if __name__ == "__main__":
+    test_connector_split_reuses_parse()
+    test_comma_split_stays_inside_span()
+    test_root_split_spans_cover_sentence()
+    test_split_doc_runs_all_rules_on_one_parse()
+    test_pipe_docs_uses_worker_processes()
+    print("\n🎉 All tests passed!")
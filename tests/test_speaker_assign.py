@@ -0,0 +1,70 @@
+import os
+import sys
+import random
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.asr_backend.speaker_assign import assign_speakers, UNKNOWN_SPEAKER
+
+def _brute_force_majority(seg_start, seg_end, turns):
+    # the previous per-segment loop over every turn
+    speaker_durations = {}
+    for turn_start, turn_end, speaker in turns:
+        overlap = min(seg_end, turn_end) - max(seg_start, turn_start)
+        if overlap > 0:
+            speaker_durations[speaker] = speaker_durations.get(speaker, 0) + overlap
+    return max(speaker_durations, key=speaker_durations.get) if speaker_durations else UNKNOWN_SPEAKER
+
+def test_segment_vote_matches_pairwise_loop():
+    print("Testing segment speaker assignment...")
+    rng = random.Random(0)
+    turns, t = [], 0.0
+    while t < 600:
+        length = rng.uniform(0.5, 8)
+        turns.append((t, t + length, f"SPEAKER_0{rng.randrange(4)}"))
+        t += length + rng.choice([0, 0, rng.uniform(0, 2)])
+    # overlapped speech from another speaker on top of the main track
+    turns += [(s, s + rng.uniform(0.2, 1.5), "SPEAKER_09") for s in sorted(rng.uniform(0, 600) for _ in range(60))[::2]]
+    segments = []
+    for _ in range(300):
+        start = rng.uniform(0, 620)
+        segments.append({'start': start, 'end': start + rng.uniform(0.2, 10), 'words': []})
+
+    assign_speakers(segments, turns)
+    for segment in segments:
+        expected = _brute_force_majority(segment['start'], segment['end'], turns)
+        assert segment['speaker_id'] == expected, (segment, expected)
+    print("✅ segment speaker assignment test passed!")
+
+def test_word_level_labels():
+    print("Testing word speaker assignment...")
+    turns = [(0.0, 2.0, "SPEAKER_00"), (2.0, 5.0, "SPEAKER_01")]
+    segments = [{'start': 0.5, 'end': 6.0, 'words': [
+        {'word': 'Hi', 'start': 0.5, 'end': 1.0},
+        {'word': 'there.', 'start': 1.2, 'end': 2.3},
+        {'word': 'Hello!', 'start': 2.5, 'end': 3.0},
+        {'word': 'Bye.', 'start': 5.5, 'end': 6.0},
+    ]}]
+    assign_speakers(segments, turns)
+    assert segments[0]['speaker_id'] == "SPEAKER_01"
+    assert [w['speaker_id'] for w in segments[0]['words']] == ["SPEAKER_00", "SPEAKER_00", "SPEAKER_01", "SPEAKER_01"]
+    print("✅ word speaker assignment test passed!")
+
+def test_zero_length_turns_are_ignored():
+    print("Testing zero-length turns...")
+    # SPEAKER_02 only has an empty turn, it can never win a vote
+    turns = [(1.0, 1.0, "SPEAKER_02"), (0.0, 2.0, "SPEAKER_00"), (3.0, 3.0, "SPEAKER_00")]
+    segments = [{'start': 0.5, 'end': 1.5, 'words': [{'word': 'Hi', 'start': 0.9, 'end': 1.1}]},
+                {'start': 2.5, 'end': 3.5, 'words': []}]
+    assign_speakers(segments, turns)
+    assert [s['speaker_id'] for s in segments] == ["SPEAKER_00", UNKNOWN_SPEAKER]
+    assert segments[0]['words'][0]['speaker_id'] == "SPEAKER_00"
+    assert assign_speakers([{'start': 0.0, 'end': 1.0}], [(0.5, 0.5, "SPEAKER_00")])[0]['speaker_id'] == UNKNOWN_SPEAKER
+    print("✅ zero-length turns test passed!")
+
+if __name__ == "__main__":
+    test_segment_vote_matches_pairwise_loop()
+    test_word_level_labels()
+    test_zero_length_turns_are_ignored()
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,120 @@
+import os
+import sys
+import shutil
+import tempfile
+import spacy
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core._3_2_split_meaning as split_meaning
+
+class CountingTokenizer:
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.seen = []
+
+    def pipe(self, texts, batch_size=256):
+        texts = list(texts)
+        self.seen.extend(texts)
+        return self.tokenizer.pipe(texts, batch_size=batch_size)
+
+def test_only_new_fragments_are_tokenized():
+    print("Testing token length cache...")
+    nlp = spacy.blank("en")
+    nlp.tokenizer = CountingTokenizer(nlp.tokenizer)
+    # the second pass only has to split the first fragment of the 12-word sentence again
+    llm_splits = {
+        "one two three four five six seven eight": "one two three four\nfive six seven eight",
+        "a b c d e f g h i j k l": "a b c d e f\ng h i j\nk l",
+        "a b c d e f": "a b c d\ne f",
+    }
+    batches = []
+    def fake_batch(items, word_limit=20, retry_attempt=0):
+        batches.append([sentence for _, sentence, _ in items])
+        return {index: llm_splits[sentence] for index, sentence, _ in items}
+    config = {"streaming_translate": False, "max_split_length": 4, "max_workers": 2, "split_batch_size": 10}
+
+    tmp_dir, cwd = tempfile.mkdtemp(), os.getcwd()
+    originals = (split_meaning.load_key, split_meaning.init_nlp, split_meaning.split_sentences_batch)
+    split_meaning.load_key = config.get
+    split_meaning.init_nlp = lambda: nlp
+    split_meaning.split_sentences_batch = fake_batch
+    try:
+        os.chdir(tmp_dir)
+        os.makedirs(os.path.dirname(split_meaning._3_1_SPLIT_BY_NLP))
+        with open(split_meaning._3_1_SPLIT_BY_NLP, 'w', encoding='utf-8') as f:
+            f.write("short one\none two three four five six seven eight\na b c d e f g h i j k l")
+        split_meaning.split_sentences_by_meaning()
+        with open(split_meaning._3_2_SPLIT_BY_MEANING, 'r', encoding='utf-8') as f:
+            sentences = f.read().split("\n")
+    finally:
+        split_meaning.load_key, split_meaning.init_nlp, split_meaning.split_sentences_batch = originals
+        os.chdir(cwd)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    assert sentences == ["short one", "one two three four", "five six seven eight", "a b c d", "e f", "g h i j", "k l"]
+    # no third pass once everything is short
+    assert batches == [["one two three four five six seven eight", "a b c d e f g h i j k l"], ["a b c d e f"]]
+    # every text is tokenized once, short ones are cache hits in later passes
+    assert len(nlp.tokenizer.seen) == len(set(nlp.tokenizer.seen)) == 3 + 5 + 2
+    print("✅ token length cache test passed!")
+
+def test_batch_split_falls_back_per_item():
+    print("Testing batched split with per-item fallback...")
+    items = [(0, "we went home and then they said so", 2), (3, "it was late but the shop was still open", 2)]
+    response = {"results": [{"id": 1, "split": "we went home [br] and then they said so"}, {"id": 2, "split": "it was late but the shop was still open"}]}
+    fallback = []
+
+    original_ask, original_split = split_meaning.ask_gpt, split_meaning.split_sentence
+    split_meaning.ask_gpt = lambda prompt, resp_type=None, valid_def=None, log_title="default": response
+    split_meaning.split_sentence = lambda sentence, num_parts, word_limit, index=-1, retry_attempt=0: fallback.append(index) or "it was late\nbut the shop was still open"
+    try:
+        results = split_meaning.split_sentences_batch(items, word_limit=5)
+    finally:
+        split_meaning.ask_gpt, split_meaning.split_sentence = original_ask, original_split
+
+    assert [line.strip() for line in results[0].split("\n")] == ["we went home", "and then they said so"]
+    assert results[3] == "it was late\nbut the shop was still open"
+    assert fallback == [3]
+    print("✅ batched split test passed!")
+
+def test_stream_keeps_order_and_saves_at_the_end():
+    print("Testing streaming split...")
+    nlp = spacy.blank("en")
+    config = {"max_split_length": 4, "max_workers": 3, "split_batch_size": 1}
+    def fake_split_sentence(sentence, num_parts, word_limit=20, index=-1, retry_attempt=0):
+        words = sentence.split()
+        return " ".join(words[:len(words) // 2]) + "\n" + " ".join(words[len(words) // 2:])
+
+    tmp_dir, cwd = tempfile.mkdtemp(), os.getcwd()
+    originals = (split_meaning.load_key, split_meaning.init_nlp, split_meaning.split_sentence)
+    split_meaning.load_key = config.get
+    split_meaning.init_nlp = lambda: nlp
+    split_meaning.split_sentence = fake_split_sentence
+    try:
+        os.chdir(tmp_dir)
+        os.makedirs(os.path.dirname(split_meaning._3_1_SPLIT_BY_NLP))
+        with open(split_meaning._3_1_SPLIT_BY_NLP, 'w', encoding='utf-8') as f:
+            f.write("a b c d e f g h\nshort one\ni j k l m n\no p")
+        stream = split_meaning.stream_split_sentences()
+        sentences = [next(stream) for _ in range(6)]
+        # nothing is saved while the stream is still being consumed
+        assert not os.path.exists(split_meaning._3_2_SPLIT_BY_MEANING)
+        sentences += list(stream)
+        with open(split_meaning._3_2_SPLIT_BY_MEANING, 'r', encoding='utf-8') as f:
+            saved = f.read().split("\n")
+    finally:
+        split_meaning.load_key, split_meaning.init_nlp, split_meaning.split_sentence = originals
+        os.chdir(cwd)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    assert sentences == ["a b c d", "e f g h", "short one", "i j k", "l m n", "o p"]
+    assert saved == sentences
+    print("✅ streaming split test passed!")
+
+if __name__ == "__main__":
+    test_only_new_fragments_are_tokenized()
+    test_batch_split_falls_back_per_item()
+    test_stream_keeps_order_and_saves_at_the_end()
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,38 @@
+import os
+import sys
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core._3_2_split_meaning import find_split_positions
+
+def _pieces(sentence, positions):
+    bounds = [0] + positions + [len(sentence)]
+    return [sentence[a:b].strip() for a, b in zip(bounds, bounds[1:])]
+
+def test_exact_split_points():
+    print("Testing split points for unchanged text...")
+    sentence = "we went to the old market in town because they said the fruit there was fresh but we stayed home"
+    modified = "we went to the old market in town [br] because they said the fruit there was fresh [br] but we stayed home"
+    assert _pieces(sentence, find_split_positions(sentence, modified)) == [
+        "we went to the old market in town",
+        "because they said the fruit there was fresh",
+        "but we stayed home",
+    ]
+    print("✅ exact split points test passed!")
+
+def test_split_points_with_llm_edits():
+    print("Testing split points for edited text...")
+    sentence = "So, in the same frame right there, Brown has committed himself whereas McDavid has not"
+    modified = "So in the same frame right there[br]brown has committed himself[br] whereas McDavid has not."
+    assert _pieces(sentence, find_split_positions(sentence, modified)) == [
+        "So, in the same frame right there,",
+        "Brown has committed himself",
+        "whereas McDavid has not",
+    ]
+    print("✅ edited split points test passed!")
+
+if __name__ == "__main__":
+    test_exact_split_points()
+    test_split_points_with_llm_edits()
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,88 @@
+import os
+import sys
+import concurrent.futures
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core._5_split_sub as split_sub
+
+def _halve(src, tr):
+    src_words, tr_words = src.split(), tr.split()
+    return [" ".join(src_words[:len(src_words) // 2]), " ".join(src_words[len(src_words) // 2:])], \
+           [" ".join(tr_words[:len(tr_words) // 2]), " ".join(tr_words[len(tr_words) // 2:])]
+
+def test_only_failing_pieces_are_resubmitted():
+    print("Testing incremental subtitle split queue...")
+    submitted = []
+    def fake_split_align_line(src, tr):
+        submitted.append(src)
+        # the first request for this line fails, the next attempt succeeds
+        if src.startswith("boom") and submitted.count(src) == 1:
+            raise ValueError("LLM refused")
+        return _halve(src, tr)
+
+    long_src = " ".join(["word"] * 40)  # 199 chars, needs two rounds
+    lines = [[("short line", "short line")], [(long_src, long_src)], [("boom " * 20, "boom " * 20)]]
+    pending = [(i, line[0]) for i, line in enumerate(lines)]
+
+    original = split_sub.split_align_line
+    split_sub.split_align_line = fake_split_align_line
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            for _ in range(3):
+                pending = split_sub.split_align_subs(lines, pending, executor)
+                if not pending:
+                    break
+    finally:
+        split_sub.split_align_line = original
+
+    assert lines[0] == [("short line", "short line")]
+    assert len(lines[1]) == 4 and " ".join(p[0] for p in lines[1]) == long_src
+    assert [p[0] for p in lines[2]] == ["boom " * 9 + "boom", "boom " * 9 + "boom"]  # failures are retried
+    assert "short line" not in submitted
+    assert submitted.count(long_src) == 1 and submitted.count("boom " * 20) == 2
+    assert len(submitted) == 5  # long and boom, then the 2 halves and boom again
+    print("✅ incremental subtitle split queue test passed!")
+
+def test_split_and_align_in_one_request():
+    print("Testing fused split and align...")
+    response = {
+        "split": "So in the same frame right there [br] Brown has committed himself",
+        "align": [{"target_part_1": "就在同一画面里，"}, {"target_part_2": "布朗已经出手了"}],
+    }
+    original = split_sub.ask_gpt
+    split_sub.ask_gpt = lambda prompt, resp_type=None, valid_def=None, log_title="default": response if valid_def(response)["status"] == "success" else None
+    try:
+        src_parts, tr_parts = split_sub.split_align_sub("So, in the same frame right there, Brown has committed himself", "就在同一画面里，布朗已经出手了")
+    finally:
+        split_sub.ask_gpt = original
+    assert src_parts == ["So, in the same frame right there,", "Brown has committed himself"]
+    assert tr_parts == ["就在同一画面里，", "布朗已经出手了"]
+    print("✅ fused split and align test passed!")
+
+def test_fallback_rejects_mismatched_alignment():
+    print("Testing split and align fallback...")
+    def failing_split_align_sub(src, tr, num_parts=2):
+        raise ValueError("invalid json")
+    originals = (split_sub.split_align_sub, split_sub.split_sentence, split_sub.align_subs)
+    split_sub.split_align_sub = failing_split_align_sub
+    split_sub.split_sentence = lambda sentence, num_parts: "first half\nsecond half"
+    split_sub.align_subs = lambda src, tr, split_src: (split_src.split("\n"), ["一", "二", "三"], "一二三")
+    try:
+        try:
+            split_sub.split_align_line("first half second half", "一二三")
+            raised = False
+        except ValueError:
+            raised = True
+    finally:
+        split_sub.split_align_sub, split_sub.split_sentence, split_sub.align_subs = originals
+    # the piece goes back to the queue instead of losing the third translation part
+    assert raised
+    print("✅ split and align fallback test passed!")
+
+if __name__ == "__main__":
+    test_only_failing_pieces_are_resubmitted()
+    test_split_and_align_in_one_request()
+    test_fallback_rejects_mismatched_alignment()
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,122 @@
+import os
+import sys
+import concurrent.futures
+from types import SimpleNamespace
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core._4_2_translate as translate
+
+class InlineExecutor:
+    """Runs every task at submit time, so a task sees the chunks exactly as they were when it was dispatched"""
+    def __init__(self, max_workers=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        future = concurrent.futures.Future()
+        future.set_result(fn(*args))
+        return future
+
+CONFIG = {
+    "max_workers": 2,
+    "translate_chunk.max_tokens": 10000,
+    "translate_chunk.max_lines": 1,
+    "translate_chunk.tokenizer": "",
+}
+
+def test_streaming_dispatches_after_next_chunk():
+    print("Testing streaming translation...")
+    sentences = [f"sentence {k}" for k in range(5)]
+    yielded, dispatched = [], []
+    def fake_stream():
+        for sentence in sentences:
+            yielded.append(sentence)
+            yield sentence
+    def fake_translate_lines(lines, previous_content_prompt, after_content_prompt, glossary_prompt, theme_prompt, index=0, reference_prompt=None):
+        dispatched.append((index, len(yielded), after_content_prompt))
+        return lines.upper(), lines
+
+    patched = {"stream_split_sentences": fake_stream, "translate_lines": fake_translate_lines,
+               "get_translation_memory": lambda: None, "load_key": CONFIG.get,
+               "concurrent": SimpleNamespace(futures=SimpleNamespace(ThreadPoolExecutor=InlineExecutor, as_completed=concurrent.futures.as_completed))}
+    originals = {name: getattr(translate, name) for name in patched}
+    for name, value in patched.items():
+        setattr(translate, name, value)
+    try:
+        chunks, results = translate.translate_chunks_streaming("theme", "glossary")
+    finally:
+        for name, value in originals.items():
+            setattr(translate, name, value)
+
+    # sentences keep their order, one chunk per sentence with max_lines 1
+    assert chunks == sentences
+    assert sorted(results) == [(i, s, s.upper()) for i, s in enumerate(sentences)]
+    assert [index for index, _, _ in dispatched] == list(range(5))
+    for index, n_yielded, after_content in dispatched[:-1]:
+        # chunk i+1 already existed, and chunk i did not wait for more than that
+        assert after_content == [sentences[index + 1]]
+        assert n_yielded == min(index + 3, len(sentences))
+    # the last chunk goes out once the stream is done, without after-context
+    assert dispatched[-1] == (4, 5, None)
+    print("✅ streaming translation test passed!")
+
+def test_default_budget_fills_cjk_chunks():
+    print("Testing default token budget...")
+    sentences = ["这是一个相当普通的中文句子，" * 5] * 20  # 70 characters each
+    token_chunks = list(translate.iter_chunks_by_tokens(sentences))
+    char_chunks = list(translate.iter_chunks(sentences, translate.CHAR_CHUNK_SIZE, translate.load_key("translate_chunk.max_lines")))
+    # fewer, fuller requests than the character budget
+    assert len(token_chunks) < len(char_chunks)
+    assert len(token_chunks[0]) > translate.CHAR_CHUNK_SIZE
+    print("✅ default token budget test passed!")
+
+class RecordingConsole:
+    def __init__(self):
+        self.messages = []
+
+    def print(self, message, *args, **kwargs):
+        self.messages.append(str(message))
+
+def _merge(chunks, results):
+    console, translate.console = translate.console, RecordingConsole()
+    try:
+        return translate.merge_chunk_results(chunks, results), translate.console.messages
+    finally:
+        translate.console = console
+
+def test_results_are_merged_by_index():
+    print("Testing chunk result reassembly...")
+    chunks = ["first line\nsecond line", "third line", "fourth line"]
+    # as_completed hands results back in completion order
+    results = [(2, "fourth line", "第四"), (0, "first line\nsecond line", "第一\n第二"), (1, "third line", "第三")]
+    (src_text, trans_text), messages = _merge(chunks, results)
+    assert src_text == ["first line", "second line", "third line", "fourth line"]
+    assert trans_text == ["第一", "第二", "第三", "第四"]
+    assert messages == []
+
+    # a slightly different echo of the source is accepted with a warning
+    (_, trans_text), messages = _merge(chunks, [(0, "first line\nsecond line", "第一\n第二"), (1, "Third line!", "第三"), (2, "fourth line", "第四")])
+    assert trans_text == ["第一", "第二", "第三", "第四"]
+    assert len(messages) == 1 and "Similar match found (chunk 1" in messages[0]
+
+    # a missing chunk fails instead of shifting every later translation
+    try:
+        _merge(chunks, [(0, "first line\nsecond line", "第一\n第二"), (2, "fourth line", "第四")])
+        raised = None
+    except ValueError as e:
+        raised = str(e)
+    assert raised == "Translation matching failed (chunk 1)"
+    print("✅ chunk result reassembly test passed!")
+
+if __name__ == "__main__":
+    test_streaming_dispatches_after_next_chunk()
+    test_default_budget_fills_cjk_chunks()
+    test_results_are_merged_by_index()
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,57 @@
+import os
+import sys
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core.translate_lines as translate_lines_module
+from core.translate_lines import translate_lines
+
+LINES = "first line\nsecond line"
+
+def _run(fake_ask_gpt):
+    calls = []
+    def ask_gpt(prompt, resp_type=None, valid_def=None, log_title="default", system_prompt=None):
+        calls.append(log_title)
+        resp = fake_ask_gpt(log_title)
+        valid = valid_def(resp)
+        if valid['status'] != 'success':
+            raise ValueError(valid['message'])
+        return resp
+
+    original_ask, original_load_key = translate_lines_module.ask_gpt, translate_lines_module.load_key
+    config = {'reflect_translate': True, 'fused_translate': True}
+    translate_lines_module.ask_gpt = ask_gpt
+    translate_lines_module.load_key = lambda key: config.get(key, 'en')
+    try:
+        result = translate_lines(LINES, None, None, None, None)
+    finally:
+        translate_lines_module.ask_gpt, translate_lines_module.load_key = original_ask, original_load_key
+    return result, calls
+
+def _answer(*sub_keys):
+    return {str(i): {"origin": line, **{k: f"{k} {i}" for k in sub_keys}} for i, line in enumerate(LINES.split('\n'), 1)}
+
+def test_fused_translation_single_request():
+    print("Testing fused translation...")
+    (translation, source), calls = _run(lambda log_title: _answer("direct", "free"))
+    assert calls == ['translate_fused']
+    assert translation == "free 1\nfree 2" and source == LINES
+    print("✅ fused translation test passed!")
+
+def test_fused_translation_falls_back_to_two_steps():
+    print("Testing fused translation fallback...")
+    answers = {
+        'translate_fused': _answer("direct"),
+        'translate_faithfulness': _answer("direct"),
+        'translate_expressiveness': _answer("free"),
+    }
+    (translation, _), calls = _run(lambda log_title: answers[log_title])
+    assert calls == ['translate_fused', 'translate_faithfulness', 'translate_expressiveness']
+    assert translation == "free 1\nfree 2"
+    print("✅ fused translation fallback test passed!")
+
+if __name__ == "__main__":
+    test_fused_translation_single_request()
+    test_fused_translation_falls_back_to_two_steps()
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,51 @@
+import os
+import sys
+import shutil
+import tempfile
+
+# Add the project root to sys.path to import core modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.utils.translation_memory import TranslationMemory
+
+def test_exact_lookup_persists_per_language_and_model():
+    print("Testing translation memory exact lookup...")
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        memory = TranslationMemory(tmp_dir, '简体中文', 'model-a')
+        memory.add([("Welcome back to the channel!", "欢迎回到频道！"), ("", "空")])
+        assert memory.lookup("welcome  back to the channel!") == "欢迎回到频道！"
+        assert memory.lookup("") is None
+
+        # a new process sees the stored lines, other languages and models do not
+        assert TranslationMemory(tmp_dir, '简体中文', 'model-a').lookup("Welcome back to the channel!") == "欢迎回到频道！"
+        assert TranslationMemory(tmp_dir, '日本語', 'model-a').lookup("Welcome back to the channel!") is None
+        assert TranslationMemory(tmp_dir, '简体中文', 'model-b').lookup("Welcome back to the channel!") is None
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print("✅ translation memory exact lookup test passed!")
+
+def test_fuzzy_lookup():
+    print("Testing translation memory fuzzy lookup...")
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        memory = TranslationMemory(tmp_dir, '简体中文', 'model-a')
+        memory.add([
+            ("Don't forget to like and subscribe for more videos.", "别忘了点赞订阅，观看更多视频。"),
+            ("Today we are going to talk about neural networks.", "今天我们来聊聊神经网络。"),
+        ])
+        src, tgt, ratio = memory.lookup_fuzzy("Don't forget to like and subscribe for more episodes.")
+        assert tgt == "别忘了点赞订阅，观看更多视频。" and ratio >= 0.85
+        assert memory.lookup_fuzzy("The weather was completely different yesterday evening.") is None
+
+        # lines added after the index is built are found as well
+        memory.add([("Thanks for watching and see you next time.", "感谢观看，下次见。")])
+        assert memory.lookup_fuzzy("Thanks for watching, and see you next time!")[1] == "感谢观看，下次见。"
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print("✅ translation memory fuzzy lookup test passed!")
+
+if __name__ == "__main__":
+    test_exact_lookup_persists_per_language_and_model()
+    test_fuzzy_lookup()
+    print("\n🎉 All tests passed!")